@@ -1,14 +1,22 @@
 import os
 import sys
-import yaml
-import glob
-import json
 from datetime import datetime
 import streamlit as st
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
 
+from src.report_loader import get_available_reports, load_report
+from src.market_schema import A_SHARE_INDICES, US_INDICES, migrate
+from src.lazy import lazy_import
+from src.market_refresher import market_refresher
+
+# 依赖 pandas/pyarrow，打开近期走势开关时才导入
+warehouse = lazy_import('src.history_warehouse')
+
+# 等待行情获取的最长时间（秒），超时后获取在后台继续
+LIVE_DATA_TIMEOUT = 60
+
 st.set_page_config(
     page_title="每日金融研报系统",
     page_icon="📊",
@@ -38,50 +46,11 @@ def get_api_key():
     return None
 
 
-def get_available_reports():
-    """获取所有可用的研报"""
-    report_dir = './reports'
-    reports = []
-    if os.path.exists(report_dir):
-        for date_folder in sorted(os.listdir(report_dir), reverse=True):
-            folder_path = os.path.join(report_dir, date_folder)
-            if os.path.isdir(folder_path):
-                report_md = os.path.join(folder_path, 'report.md')
-                if os.path.exists(report_md):
-                    reports.append({
-                        'date': date_folder,
-                        'path': report_md,
-                        'folder': folder_path
-                    })
-    return reports
-
-
-def load_report_data(report_info):
-    """加载研报数据和内容"""
-    content = ""
-    data = {}
-    
-    with open(report_info['path'], 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    data_paths = [
-        os.path.join(report_info['folder'], f'data_{report_info["date"]}.json'),
-        os.path.join(report_info['folder'], 'data.json')
-    ]
-    for dp in data_paths:
-        if os.path.exists(dp):
-            with open(dp, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            break
-    
-    return content, data
-
-
-def fetch_live_data():
-    """获取实时数据"""
-    from src.report_generator import ReportGenerator
-    gen = ReportGenerator()
-    return gen.fetch_all_data()
+def fetch_live_data(force: bool = False):
+    """读取共享行情快照（后台线程定时刷新，各会话的刷新请求合并为一次获取）"""
+    if force:
+        return market_refresher.refresh(timeout=LIVE_DATA_TIMEOUT)
+    return market_refresher.get(timeout=LIVE_DATA_TIMEOUT)
 
 
 def stream_ai_analysis(data):
@@ -130,85 +99,82 @@ def main():
         report_info = next((r for r in reports if r['date'] == selected_date), None)
         
         if report_info:
-            content, data = load_report_data(report_info)
+            report = load_report(report_info)
+            content, data = report.content, report.data
             
             st.header(f"📅 {selected_date} 每日市场观察")
-            st.caption(f"数据时间: {data.get('update_time', '-')}")
+            st.caption(f"数据时间: {data.update_time or '-'}")
             
             # 市场数据表格
             col1, col2, col3 = st.columns(3)
             
             with col1:
                 st.subheader("A股")
-                a_share = data.get('a_share', {})
-                for name in ['上证指数', '深证成指', '创业板指']:
-                    if name in a_share:
-                        idx = a_share[name]
-                        change = idx.get('change_pct', 0)
-                        st.metric(name, f"{idx.get('price', 0):.2f}", f"{change:+.2f}%")
+                for name in A_SHARE_INDICES:
+                    idx = data.a_share.get(name)
+                    if idx and idx.price is not None:
+                        st.metric(name, f"{idx.price:.2f}", f"{idx.change_pct or 0:+.2f}%")
             
             with col2:
                 st.subheader("美股")
-                us_stock = data.get('us_stock', {})
-                for name in ['道琼斯', '标普500', '纳斯达克']:
-                    if name in us_stock:
-                        idx = us_stock[name]
-                        change = idx.get('change_pct', 0)
-                        st.metric(name, f"{idx.get('price', 0):,.2f}", f"{change:+.2f}%")
+                for name in US_INDICES:
+                    idx = data.us_stock.get(name)
+                    if idx and idx.price is not None:
+                        st.metric(name, f"{idx.price:,.2f}", f"{idx.change_pct or 0:+.2f}%")
             
             with col3:
                 st.subheader("黄金")
-                gold = data.get('gold', {})
-                if 'AU9999' in gold:
-                    st.metric("AU9999", f"{gold['AU9999'].get('price', '-')}元/克")
-                if 'XAU' in gold:
-                    st.metric("XAU", f"{gold['XAU'].get('price', '-')}美元/盎司")
+                if 'AU9999' in data.gold:
+                    st.metric("AU9999", f"{data.gold['AU9999'].price}元/克")
+                if 'XAU' in data.gold:
+                    st.metric("XAU", f"{data.gold['XAU'].price}美元/盎司")
+            
+            # 近期走势（历史行情仓库）；expander 折叠时其内容也会执行，用开关控制是否读取
+            if st.toggle("近期走势", key="show_history"):
+                history = warehouse.history_warehouse.index_history('上证指数', days=60, end=selected_date)
+                if len(history) > 1:
+                    st.line_chart(history.set_index('date')['price'])
+                    leaders = warehouse.history_warehouse.sector_leader_counts(
+                        start=history['date'].iloc[0], end=selected_date).head(5)
+                    if not leaders.empty:
+                        st.caption("领涨次数最多的板块: " + "，".join(f"{k}({v}次)" for k, v in leaders.items()))
+                else:
+                    st.caption("历史数据不足（运行 python src/history_warehouse.py --rebuild 导入）")
             
             # 板块数据
             st.subheader("行业板块")
-            sectors = data.get('sectors', {})
             col1, col2 = st.columns(2)
             
             with col1:
-                gainers = sectors.get('top_gainers', [])
-                if gainers:
+                if data.top_gainers:
                     st.markdown("**领涨**")
-                    for g in gainers[:5]:
-                        st.text(f"{g.get('板块名称', '-')}: {g.get('涨跌幅', 0):+.2f}%")
+                    for g in data.top_gainers[:5]:
+                        st.text(f"{g.name}: {g.change_pct or 0:+.2f}%")
             
             with col2:
-                losers = sectors.get('top_losers', [])
-                if losers:
+                if data.top_losers:
                     st.markdown("**领跌**")
-                    for l in losers[:5]:
-                        st.text(f"{l.get('板块名称', '-')}: {l.get('涨跌幅', 0):+.2f}%")
+                    for l in data.top_losers[:5]:
+                        st.text(f"{l.name}: {l.change_pct or 0:+.2f}%")
             
             # 红利低波50成分股
             st.subheader("红利低波50指数成分股（前10）")
-            dividend = data.get('dividend_index', {})
-            components = dividend.get('top_components', [])
-            if components:
+            if data.dividend_components:
                 comp_data = []
-                for c in components[:10]:
+                for c in data.dividend_components[:10]:
                     comp_data.append({
-                        '代码': c.get('成分券代码', '-'),
-                        '名称': c.get('成分券名称', '-'),
-                        '权重': f"{c.get('权重', 0):.2f}%"
+                        '代码': c.code,
+                        '名称': c.name,
+                        '权重': f"{c.weight or 0:.2f}%"
                     })
                 st.table(comp_data)
             
             st.markdown("---")
             
             # 显示AI分析
-            if "## AI分析" in content:
-                ai_start = content.find("## AI分析")
-                ai_end = content.find("---", ai_start)
-                if ai_end == -1:
-                    ai_end = len(content)
-                ai_content = content[ai_start:ai_end].replace("## AI分析", "").strip()
-                
+            if report.ai_content:
                 st.subheader("🤖 AI分析")
-                st.markdown(ai_content)
+                st.markdown(report.ai_content)
             
             # 下载
             st.download_button(
@@ -225,17 +191,28 @@ def main():
             st.error("请先配置API Key")
             return
         
-        if st.button("📊 获取实时数据", type="primary"):
+        force = st.button("🔄 刷新实时数据")
+        # 本会话显示的数据：之后的重新运行（如点击生成AI分析）沿用同一份，不再读取共享快照
+        data = None if force else st.session_state.get('today_data')
+        if data is not None and data.get('date') != datetime.now().strftime('%Y-%m-%d'):
+            data = None
+        if data is None:
             with st.spinner("获取数据中..."):
                 try:
-                    data = fetch_live_data()
+                    data = fetch_live_data(force=force)
                     st.session_state['today_data'] = data
-                    st.success("✅ 数据获取完成")
                 except Exception as e:
                     st.error(f"失败: {e}")
         
-        if 'today_data' in st.session_state:
-            data = st.session_state['today_data']
+        status = market_refresher.status()
+        if data is not None:
+            st.caption(f"数据时间 {data.get('update_time') or '-'}（所有用户共享，后台每{market_refresher.interval}秒刷新，"
+                       f"点击刷新实时数据获取最新快照）")
+        if status['error'] and data is not None:
+            st.warning(f"最近一次刷新失败，显示的是上一次的数据: {status['error']}")
+        
+        if data is not None:
+            snapshot = migrate(data)
             
             # 显示数据摘要
             st.subheader("数据摘要")
@@ -243,13 +220,13 @@ def main():
             col1, col2 = st.columns(2)
             with col1:
                 st.markdown("**A股**")
-                for name, idx in data.get('a_share', {}).items():
-                    st.text(f"{name}: {idx.get('price', 0):.2f} ({idx.get('change_pct', 0):+.2f}%)")
+                for name, idx in snapshot.a_share.items():
+                    st.text(f"{name}: {idx.price or 0:.2f} ({idx.change_pct or 0:+.2f}%)")
             
             with col2:
                 st.markdown("**美股**")
-                for name, idx in data.get('us_stock', {}).items():
-                    st.text(f"{name}: {idx.get('price', 0):,.2f} ({idx.get('change_pct', 0):+.2f}%)")
+                for name, idx in snapshot.us_stock.items():
+                    st.text(f"{name}: {idx.price or 0:,.2f} ({idx.change_pct or 0:+.2f}%)")
             
             # 流式生成AI分析
             st.markdown("---")
@@ -257,15 +234,16 @@ def main():
             if st.button("🤖 生成AI分析（流式输出）", type="primary"):
                 st.subheader("AI分析")
                 
-                # 创建占位符用于流式输出
-                output_placeholder = st.empty()
-                full_content = ""
+                # 节流渲染：已完成的段落只渲染一次，只重绘最后一段
+                from src.stream_renderer import StreamRenderer
+                renderer = StreamRenderer(st.container())
                 
                 try:
                     for chunk in stream_ai_analysis(data):
-                        full_content += chunk
-                        output_placeholder.markdown(full_content)
+                        renderer.write(chunk)
+                    renderer.close()
                 except Exception as e:
+                    renderer.close()
                     st.error(f"生成失败: {e}")
 
 
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+冷启动导入预算
+在全新的解释器中分别导入 Web 页面和定时任务启动时用到的模块，检查导入耗时
+以及是否提前加载了重型依赖（pandas、数据源库等只应在首次获取数据时导入），超出预算时返回1
+
+使用方式：
+  python benchmarks/import_budget.py
+  python benchmarks/import_budget.py --repeat 5 --scale 2   # 较慢的机器放宽耗时上限
+"""
+
+import os
+import sys
+import ast
+import json
+import argparse
+import subprocess
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 启动时不应加载的依赖
+HEAVY_MODULES = ('pandas', 'numpy', 'pyarrow', 'requests', 'akshare', 'yfinance', 'openai')
+
+# 模块: 导入耗时上限（毫秒，不含解释器启动）；以 .py 结尾的项目导入该脚本顶层导入的全部 src 模块
+IMPORT_BUDGETS = {
+    'app.py': 300,
+    'cron_job.py': 300,
+    'src': 50,
+    'src.report_loader': 250,
+    'src.history_warehouse': 150,
+    'src.market_refresher': 150,
+    'src.report_generator': 300,
+    'src.pipeline': 150,
+    'src.trading_calendar': 150,
+    'src.sina_quote': 150
+}
+
+_CHILD = """
+import sys, time, json, importlib
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+for module in {modules!r}:
+    importlib.import_module(module)
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def script_imports(script: str) -> List[str]:
+    """入口脚本顶层（模块级，含函数外的 try 等语句）导入的 src 模块，不含 streamlit 等界面框架"""
+    with open(os.path.join(ROOT, script), 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    modules = []
+    nodes = list(tree.body)
+    while nodes:
+        node = nodes.pop(0)
+        if isinstance(node, ast.ImportFrom) and node.module and node.module.split('.')[0] == 'src':
+            modules.append(node.module)
+        elif isinstance(node, ast.Import):
+            modules.extend(a.name for a in node.names if a.name.split('.')[0] == 'src')
+        elif isinstance(node, (ast.Try, ast.If)):
+            nodes.extend(node.body)
+    return list(dict.fromkeys(modules))
+
+
+def measure_import(module: str, repeat: int = 3) -> Tuple[List[float], List[str]]:
+    """在新的解释器中导入模块 repeat 次，返回每次耗时（秒）和加载了的重型依赖"""
+    times, loaded = [], []
+    modules = script_imports(module) if module.endswith('.py') else [module]
+    code = _CHILD.format(root=ROOT, modules=modules, heavy=HEAVY_MODULES)
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True,
+                             text=True, timeout=120)
+        if out.returncode != 0:
+            raise RuntimeError(f"导入 {module} 失败: {out.stderr.strip().splitlines()[-1:]}")
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        times.append(result['seconds'])
+        loaded = result['loaded']
+    return times, loaded
+
+
+def check_budgets(repeat: int = 3, scale: float = 1.0) -> Dict[str, Dict]:
+    """检查全部模块，返回 {模块: {ms, budget_ms, loaded, ok}}"""
+    results = {}
+    for module, budget in IMPORT_BUDGETS.items():
+        times, loaded = measure_import(module, repeat)
+        ms = min(times) * 1000
+        limit = budget * scale
+        results[module] = {'ms': round(ms, 1), 'budget_ms': limit, 'loaded': loaded,
+                           'ok': ms <= limit and not loaded}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='冷启动导入预算检查')
+    parser.add_argument('--repeat', type=int, default=3, help='每个模块导入次数（取最小值）')
+    parser.add_argument('--scale', type=float, default=1.0, help='耗时上限倍数')
+    args = parser.parse_args()
+
+    results = check_budgets(args.repeat, args.scale)
+    for module, r in results.items():
+        mark = "✅" if r['ok'] else "❌"
+        extra = f"  提前加载: {', '.join(r['loaded'])}" if r['loaded'] else ""
+        print(f"{mark} {module:<24} {r['ms']:>8.1f} ms / {r['budget_ms']:.0f} ms{extra}")
+
+    failed = [m for m, r in results.items() if not r['ok']]
+    if failed:
+        print(f"❌ {len(failed)} 个模块超出导入预算: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
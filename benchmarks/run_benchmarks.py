@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+日报流程基准测试
+覆盖数据获取（回放模式）、技术指标、提示词构建、报告渲染和历史研报加载，
+记录耗时和峰值内存并追加到 benchmarks/history.jsonl，与上一次结果对比
+
+使用方式：
+  python benchmarks/run_benchmarks.py                    # 全部
+  python benchmarks/run_benchmarks.py --quick            # 缩小规模
+  python benchmarks/run_benchmarks.py --only indicators  # 只运行名称以此开头的项目
+  python benchmarks/run_benchmarks.py --only snapshot    # 数据文件往返检查（含 numpy 技术指标）
+  python benchmarks/run_benchmarks.py --mock-llm         # 附加本地模拟LLM的流式生成
+  python benchmarks/run_benchmarks.py --only import      # 冷启动导入耗时（预算检查见 import_budget.py）
+  python benchmarks/run_benchmarks.py --fail-on-regression --threshold 0.25  # 中位数变慢超过25%时返回1
+
+数据获取基准需要先录制行情（见 docs/DEPLOYMENT.md），未录制时跳过
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.technical_analysis import TechnicalAnalyzer
+from src.report_loader import get_available_reports, load_report_data
+from src.stream_renderer import StreamRenderer
+from src.market_schema import load_snapshot, save_snapshot
+from benchmarks.import_budget import IMPORT_BUDGETS, measure_import
+
+HISTORY_FILE = os.path.join(ROOT, 'benchmarks', 'history.jsonl')
+
+# 单标的K线长度：60日 ~ 20年
+BAR_COUNTS = [60, 250, 1250, 5000]
+# 多标的面板：标的数量（每个标的250根K线）
+PANEL_SIZES = [1, 100, 1000, 5000]
+PANEL_BARS = 250
+
+
+class Bench:
+    """基准项目集合"""
+
+    def __init__(self, repeat: int = 5, only: Optional[str] = None):
+        self.repeat = repeat
+        self.only = only
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    def run(self, name: str, func: Callable[[], Any], repeat: Optional[int] = None):
+        """多次运行取最小值和中位数，另运行一次统计峰值内存"""
+        if not self.selected(name):
+            return
+        repeat = repeat or self.repeat
+        func()  # 预热
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.record(name, times, peak)
+
+    def record(self, name: str, times: List[float], peak: Optional[int] = None):
+        """记录在别处计时的结果（如子进程）"""
+        self.results[name] = {
+            'min': round(min(times), 6),
+            'median': round(statistics.median(times), 6),
+            'repeat': len(times),
+            'peak_kb': round(peak / 1024, 1) if peak is not None else None
+        }
+        peak_text = f"{self.results[name]['peak_kb']:>10.1f} KB" if peak is not None else f"{'-':>10} KB"
+        print(f"  {name:<40} 中位数 {self.results[name]['median'] * 1000:>10.2f} ms   "
+              f"峰值内存 {peak_text}")
+
+    def selected(self, name: str) -> bool:
+        return not self.only or name.startswith(self.only)
+
+    def skip(self, name: str, reason: str):
+        if not self.selected(name):
+            return
+        print(f"  {name:<40} 跳过: {reason}")
+
+
+def make_ohlcv(bars: int, seed: int = 0) -> pd.DataFrame:
+    """生成随机游走的日线数据"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, bars)))
+    spread = np.abs(rng.normal(0, 0.005, bars)) * close
+    return pd.DataFrame({
+        'open': close + rng.normal(0, 0.002, bars) * close,
+        'high': close + spread,
+        'low': close - spread,
+        'close': close,
+        'volume': rng.integers(1_000_000, 10_000_000, bars).astype(float)
+    }, index=pd.bdate_range('2000-01-03', periods=bars))
+
+
+def make_panel(symbols: int, bars: int, seed: int = 0) -> Dict[str, pd.DataFrame]:
+    """生成多标的面板（日期 x 标的）"""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range('2000-01-03', periods=bars)
+    columns = [f"S{i:05d}" for i in range(symbols)]
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (bars, symbols)), axis=0))
+    spread = np.abs(rng.normal(0, 0.005, (bars, symbols))) * close
+    volume = rng.integers(1_000_000, 10_000_000, (bars, symbols)).astype(float)
+    frame = lambda values: pd.DataFrame(values, index=index, columns=columns)
+    return {
+        'close': frame(close),
+        'high': frame(close + spread),
+        'low': frame(close - spread),
+        'volume': frame(volume)
+    }
+
+
+# ==================== 基准项目 ====================
+
+def bench_indicators(bench: Bench, quick: bool):
+    print("\n技术指标（单标的）")
+    for bars in BAR_COUNTS[:3] if quick else BAR_COUNTS:
+        df = make_ohlcv(bars)
+        bench.run(f"indicators.single.{bars}", lambda: TechnicalAnalyzer.calculate_all_indicators(df))
+
+    print("\n技术指标（多标的面板）")
+    for symbols in PANEL_SIZES[:3] if quick else PANEL_SIZES:
+        panel = make_panel(symbols, PANEL_BARS)
+        repeat = 3 if symbols >= 1000 else None
+        bench.run(f"indicators.panel.{symbols}",
+                  lambda: TechnicalAnalyzer.calculate_panel_indicators(**panel), repeat=repeat)
+
+
+def bench_snapshot(bench: Bench):
+    print("\n数据文件读写（含技术指标）")
+    df = TechnicalAnalyzer.calculate_all_indicators(make_ohlcv(250))
+    signals = TechnicalAnalyzer.get_latest_signals(df)
+    data = {'date': '2000-12-29', 'a_share': {'上证指数': {'price': 3000.0, 'change_pct': 0.5}},
+            'indicators': {'上证指数': signals}}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'data.json')
+        # 往返检查：numpy 数值可以写入，读回后为float且与原值一致
+        save_snapshot(path, data)
+        loaded = load_snapshot(path).indicators['上证指数']
+        assert loaded.keys() == signals.keys(), "技术指标读回后字段不一致"
+        for key, value in signals.items():
+            if isinstance(value, str):
+                assert loaded[key] == value, f"{key} 读回后不一致"
+            else:
+                assert type(loaded[key]) is float and loaded[key] == float(value), f"{key} 读回后不是相同的float"
+        bench.run("snapshot.save", lambda: save_snapshot(path, data))
+        bench.run("snapshot.load", lambda: load_snapshot(path))
+
+
+def bench_imports(bench: Bench):
+    print("\n冷启动导入（新的解释器）")
+    for module in IMPORT_BUDGETS:
+        name = f"import.{module}"
+        if bench.selected(name):
+            times, _ = measure_import(module, bench.repeat)
+            bench.record(name, times)
+
+
+def bench_fetcher(bench: Bench):
+    print("\n数据获取（回放模式）")
+    from src.fixtures import fixture_store, FixtureMissingError
+    from src.data_fetcher import DataFetcher
+    from src.ohlcv_store import OHLCVStore
+    from src.cache import is_empty
+
+    if not os.path.isdir(fixture_store.directory):
+        bench.skip("fetcher", f"未找到录制目录 {fixture_store.directory}")
+        return
+
+    saved = (fixture_store.mode, fixture_store.latency)
+    fixture_store.mode, fixture_store.latency = 'replay', '0'
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            fetcher = DataFetcher(store=OHLCVStore(os.path.join(tmp, 'ohlcv')))
+            calls = {
+                'fetcher.a_share_index': lambda: fetcher.get_a_share_index(refresh=True),
+                'fetcher.sector_flow': lambda: fetcher.get_sector_flow(refresh=True),
+                'fetcher.nasdaq_overview': lambda: fetcher.get_nasdaq_overview(refresh=True),
+                'fetcher.gold_price': lambda: fetcher.get_gold_price(refresh=True),
+                'fetcher.dividend_etfs': lambda: fetcher.get_dividend_etfs(refresh=True),
+                'fetcher.ai_leaders': lambda: fetcher.get_ai_leaders(refresh=True),
+            }
+            for name, func in calls.items():
+                # 获取方法内部会吞掉异常，结果为空即视为未录制
+                try:
+                    empty = is_empty(func())
+                except FixtureMissingError:
+                    empty = True
+                if empty:
+                    bench.skip(name, "未录制或回放失败")
+                    continue
+                bench.run(name, func)
+    finally:
+        fixture_store.mode, fixture_store.latency = saved
+
+
+class _NullPlaceholder:
+    def markdown(self, text: str):
+        pass
+
+
+class _NullContainer:
+    """代替 st.container() 的空容器"""
+
+    def empty(self):
+        return _NullPlaceholder()
+
+
+def bench_report(bench: Bench, reports_dir: str):
+    print("\n研报构建与加载")
+    from src.report_generator import ReportGenerator
+
+    reports = get_available_reports(reports_dir)
+    if not reports:
+        bench.skip("report", f"{reports_dir} 下没有研报")
+        return
+
+    bench.run("report.list", lambda: get_available_reports(reports_dir))
+    bench.run("report.load_all", lambda: [load_report_data(r) for r in reports])
+
+    content, snapshot = load_report_data(reports[0])
+    if not reports[0].get('data_path'):
+        bench.skip("report.build_prompt", f"{reports[0]['date']} 没有数据文件")
+        return
+    data = snapshot.to_dict()
+
+    # 只用到不依赖API Key的方法，跳过 __init__ 避免创建客户端和输出目录
+    generator = ReportGenerator.__new__(ReportGenerator)
+    generator.date_str = reports[0]['date']
+    ai_content = content.split('## AI分析', 1)[-1]
+
+    bench.run("report.build_prompt", lambda: generator.build_prompt(data))
+    bench.run("report.render", lambda: generator.render_report(data, ai_content))
+
+    chunks = [ai_content[i:i + 2] for i in range(0, len(ai_content), 2)]
+
+    def render_stream():
+        renderer = StreamRenderer(_NullContainer(), interval=0)
+        for chunk in chunks:
+            renderer.write(chunk)
+        renderer.close()
+
+    bench.run("report.stream_render", render_stream)
+
+
+def bench_mock_llm(bench: Bench):
+    print("\nAI分析流式生成（本地模拟服务）")
+    from src.mock_llm_server import MockLLMServer
+    from src.report_generator import ReportGenerator
+
+    cwd = os.getcwd()
+    env = {k: os.environ.get(k) for k in ('LLM_BASE_URL', 'SILICONFLOW_API_KEY')}
+    with MockLLMServer(tokens_per_sec=2000, first_token_delay=0.05) as server, \
+            tempfile.TemporaryDirectory() as tmp:
+        os.environ['LLM_BASE_URL'] = server.base_url
+        os.environ['SILICONFLOW_API_KEY'] = 'mock'
+        os.chdir(tmp)  # 输出目录、缓存和统计日志写到临时目录
+        try:
+            generator = ReportGenerator(os.path.join(ROOT, 'config.yaml'))
+            data = {'update_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+            bench.run("llm.stream", lambda: "".join(generator.generate_ai_analysis_stream(data, use_cache=False)),
+                      repeat=3)
+        finally:
+            os.chdir(cwd)
+            for k, v in env.items():
+                if v is None:
+                    os.environ.pop(k, None)
+                else:
+                    os.environ[k] = v
+
+
+# ==================== 历史记录 ====================
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def load_history(path: str) -> List[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """与上一次结果对比，返回变慢超过阈值的项目"""
+    regressions = []
+    print(f"\n与上一次结果对比（{previous.get('run_at')} {previous.get('revision') or ''}）")
+    for name, result in current.items():
+        before = previous.get('results', {}).get(name)
+        if not before or not before.get('median'):
+            continue
+        ratio = result['median'] / before['median']
+        mark = ""
+        if ratio > 1 + threshold:
+            mark = "  ⚠️ 变慢"
+            regressions.append(name)
+        print(f"  {name:<40} {ratio:>6.2f}x{mark}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='日报流程基准测试')
+    parser.add_argument('--repeat', type=int, default=5, help='每个项目的运行次数')
+    parser.add_argument('--quick', action='store_true', help='跳过最大规模的项目')
+    parser.add_argument('--only', help='只运行名称以此开头的项目，如 indicators / fetcher / report')
+    parser.add_argument('--reports-dir', default=os.path.join(ROOT, 'reports'), help='历史研报目录')
+    parser.add_argument('--mock-llm', action='store_true', help='附加本地模拟LLM的流式生成')
+    parser.add_argument('--history', default=HISTORY_FILE, help='结果历史文件')
+    parser.add_argument('--no-save', action='store_true', help='不写入历史文件')
+    parser.add_argument('--threshold', type=float, default=0.25, help='判定变慢的中位数增幅')
+    parser.add_argument('--fail-on-regression', action='store_true', help='有项目变慢时返回1')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"基准测试 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("=" * 60)
+
+    bench = Bench(repeat=args.repeat, only=args.only)
+    bench_imports(bench)
+    bench_indicators(bench, args.quick)
+    bench_snapshot(bench)
+    bench_fetcher(bench)
+    bench_report(bench, args.reports_dir)
+    if args.mock_llm:
+        bench_mock_llm(bench)
+
+    history = load_history(args.history)
+    regressions = compare(history[-1], bench.results, args.threshold) if history else []
+
+    if not args.no_save and bench.results:
+        record = {
+            'run_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'quick': args.quick,
+            'results': bench.results
+        }
+        os.makedirs(os.path.dirname(args.history), exist_ok=True)
+        with open(args.history, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        print(f"\n结果已追加到 {args.history}")
+
+    if regressions and args.fail_on_regression:
+        print(f"❌ {len(regressions)} 个项目变慢: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,14 @@
 """
 
 import akshare as ak
-import requests
 import json
+import sys
 from datetime import datetime
 import os
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from sina_quote import sina_client
+
 # 创建数据目录
 data_dir = "reports/2026-02-05"
 os.makedirs(data_dir, exist_ok=True)
@@ -46,29 +49,28 @@ except Exception as e:
 
 # 2. 美股指数
 print("\n2️⃣ 获取美股指数...")
+us_symbols = [
+    ('int_nasdaq', '纳斯达克'),
+    ('int_sp500', '标普500'),
+    ('int_dji', '道琼斯')
+]
+# 美股指数和黄金合并为一次新浪行情请求
 try:
-    headers = {'Referer': 'https://finance.sina.com.cn'}
-    us_symbols = [
-        ('int_nasdaq', '纳斯达克'),
-        ('int_sp500', '标普500'),
-        ('int_dji', '道琼斯')
-    ]
-    for symbol, name in us_symbols:
-        url = f"https://hq.sinajs.cn/list={symbol}"
-        r = requests.get(url, headers=headers, timeout=10)
-        if r.status_code == 200 and 'hq_str' in r.text:
-            # 解析: var hq_str_int_nasdaq="纳斯达克,22484.07,99.37,0.44";
-            content = r.text.split('"')[1]
-            parts = content.split(',')
-            if len(parts) >= 4:
-                data['us_stock'][name] = {
-                    'price': float(parts[1]),
-                    'change': float(parts[2]),
-                    'change_pct': float(parts[3])
-                }
-                print(f"   {name}: {parts[1]} ({parts[3]}%)")
+    quotes = sina_client.fetch([s for s, _ in us_symbols] + ['hf_GC', 'AU0'])
 except Exception as e:
-    print(f"   ❌ 美股指数获取失败: {e}")
+    print(f"   ❌ 新浪行情获取失败: {e}")
+    quotes = {}
+
+for symbol, name in us_symbols:
+    # 解析: var hq_str_int_nasdaq="纳斯达克,22484.07,99.37,0.44";
+    quote = quotes.get(symbol)
+    if quote and quote.price is not None and quote.change_pct is not None:
+        data['us_stock'][name] = {
+            'price': quote.price,
+            'change': quote.change,
+            'change_pct': quote.change_pct
+        }
+        print(f"   {name}: {quote.price} ({quote.change_pct}%)")
 
 # 3. 板块数据 - 尝试新浪财经的板块接口
 print("\n3️⃣ 获取板块数据...")
@@ -98,26 +100,19 @@ except Exception as e:
 
 # 4. 黄金价格
 print("\n4️⃣ 获取黄金价格...")
-try:
-    # 使用新浪财经黄金T+D接口
-    headers = {'Referer': 'https://finance.sina.com.cn'}
-    url = "https://hq.sinajs.cn/list=hf_GC"
-    r = requests.get(url, headers=headers, timeout=10)
-    if r.status_code == 200:
-        content = r.text
-        print(f"   黄金期货数据: {content[:100]}")
-        # 解析COMEX黄金数据
-        data['gold']['comex'] = {'note': '数据待解析', 'raw': content[:200]}
-    
-    # 国内黄金
-    url2 = "https://hq.sinajs.cn/list=AU0"
-    r2 = requests.get(url2, headers=headers, timeout=10)
-    if r2.status_code == 200:
-        print(f"   国内黄金: {r2.text[:100]}")
-        data['gold']['domestic'] = {'raw': r2.text[:200]}
-        
-except Exception as e:
-    print(f"   ❌ 黄金数据获取失败: {e}")
+comex = quotes.get('hf_GC')
+if comex:
+    raw = ','.join(comex.fields)
+    print(f"   黄金期货数据: {raw[:100]}")
+    # 解析COMEX黄金数据
+    data['gold']['comex'] = {'note': '数据待解析', 'raw': raw[:200]}
+
+# 国内黄金
+domestic = quotes.get('AU0')
+if domestic:
+    raw = ','.join(domestic.fields)
+    print(f"   国内黄金: {raw[:100]}")
+    data['gold']['domestic'] = {'raw': raw[:200]}
 
 # 保存数据
 print("\n💾 保存数据...")
@@ -5,6 +5,7 @@
 使用方式：
   python cron_job.py --run-once     # 立即运行一次
   python cron_job.py --run-once --force  # 强制运行（无视交易日）
+  python cron_job.py --run-once --fresh  # 丢弃今天已完成的阶段，从头运行
   python cron_job.py                # 持续运行，按cron表达式定时执行
 """
 
@@ -34,32 +35,130 @@ sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src
 def is_trading_day(date: datetime = None) -> bool:
     """
     判断是否为交易日
-    周末返回False
+    使用本地缓存的交易日历（data/calendar/，每月刷新），无法获取日历时按周一到周五判断
     """
-    if date is None:
-        date = datetime.now()
-    
-    # 周六、周日
-    if date.weekday() >= 5:
-        return False
-    
-    # 尝试使用akshare获取交易日历
+    from src.trading_calendar import trading_calendar
+    return trading_calendar.is_trading_day(date or datetime.now())
+
+
+# 各阶段默认策略: (超时秒数, 重试次数)，可在 config.yaml 的 pipeline.stages 中覆盖
+STAGE_POLICIES = {
+    'calendar': (30, 1),
+    'generator': (None, 0),
+    'fetch': (20, 1),
+    'indicators': (60, 1),
+    'data': (None, 0),
+    'prompt': (None, 0),
+    'llm': (900, 1),
+    'render': (None, 0),
+    'save': (None, 1)
+}
+
+
+def load_pipeline_config(config_path: str = "config.yaml") -> dict:
+    """读取 config.yaml 中的 pipeline 配置"""
     try:
-        import akshare as ak
-        tool_trade_date_hist_sina = ak.tool_trade_date_hist_sina()
-        date_str = date.strftime('%Y-%m-%d')
-        return date_str in tool_trade_date_hist_sina['trade_date'].values
-    except Exception:
-        # 如果无法获取，默认周一到周五为交易日
-        return date.weekday() < 5
+        from src.registry import get_config
+        return get_config(config_path).get('pipeline', {}) or {}
+    except ImportError:
+        return {}
+
 
+def build_pipeline(force: bool = False, config: dict = None):
+    """
+    构建日报阶段依赖图
 
-def run_daily_report(force: bool = False):
+    calendar → generator → 各数据获取/技术指标（并发）→ data → prompt → llm → render → save
+    """
+    from src.pipeline import Pipeline, Stage, StageSkip
+
+    config = config or {}
+    overrides = config.get('stages', {}) or {}
+    fetch_keys = ['a_share', 'quotes', 'sectors', 'dividend_index']
+
+    def stage(name, func, deps=(), policy=None, **kwargs):
+        timeout, retries = STAGE_POLICIES[policy or name]
+        override = {**(overrides.get(policy or name) or {}), **(overrides.get(name) or {})}
+        return Stage(
+            name, func, tuple(deps),
+            timeout=override.get('timeout', timeout),
+            retries=override.get('retries', retries),
+            retry_delay=override.get('retry_delay', 2.0),
+            **kwargs
+        )
+
+    def check_calendar(inputs):
+        if not force and not is_trading_day():
+            raise StageSkip("今天不是交易日，跳过研报生成")
+        return True
+
+    def create_generator(inputs):
+        from src.report_generator import ReportGenerator
+        return ReportGenerator()
+
+    def fetch_step(key):
+        return lambda inputs: inputs['generator'].fetch_stages()[key]()
+
+    def merge_data(inputs):
+        generator = inputs['generator']
+        data = generator.empty_data()
+        for key in fetch_keys + ['indicators']:
+            if inputs.get(key):
+                data.update(inputs[key])
+        generator.attach_history(data)
+        generator.save_data(data)
+        return data
+
+    def generate_ai(inputs, cancel):
+        generator = inputs['generator']
+        stream = generator.generate_ai_analysis_stream(inputs['data'], prompt=inputs['prompt'])
+        chunks = []
+        try:
+            for chunk in stream:
+                if cancel.is_set():
+                    # 阶段已超时：关闭流式请求，不再继续消耗 token
+                    raise RuntimeError("生成已取消")
+                chunks.append(chunk)
+        finally:
+            stream.close()
+        content = "".join(chunks)
+        if generator.ERROR_MARKER in content:
+            # 流式接口把错误写进输出，这里转为异常以便重试
+            raise RuntimeError(content[content.index(generator.ERROR_MARKER):].strip())
+        return content
+
+    stages = [
+        stage('calendar', check_calendar, persist=False),
+        stage('generator', create_generator, ['calendar'], persist=False),
+        # 获取方法内部捕获网络错误并返回空分区，空输出按失败处理以触发重试
+        *[stage(key, fetch_step(key), ['generator'], policy='fetch', optional=True, allow_empty=False)
+          for key in fetch_keys],
+        stage('indicators', lambda inputs: inputs['generator']._fetch_indicators(), ['generator'],
+              optional=True, allow_empty=False),
+        stage('data', merge_data, ['generator', *fetch_keys, 'indicators']),
+        stage('prompt', lambda inputs: inputs['generator'].build_prompt(inputs['data']), ['generator', 'data']),
+        stage('llm', generate_ai, ['generator', 'data', 'prompt'], cancellable=True),
+        stage('render', lambda inputs: inputs['generator'].render_report(inputs['data'], inputs['llm']),
+              ['generator', 'data', 'llm']),
+        stage('save', lambda inputs: inputs['generator'].save_report(inputs['render']), ['generator', 'render'])
+    ]
+    return Pipeline(
+        stages,
+        state_dir=config.get('state_dir', 'data/pipeline'),
+        max_workers=config.get('max_workers', 8),
+        log=logger.info
+    )
+
+
+def run_daily_report(force: bool = False, fresh: bool = False):
     """
     运行每日研报生成任务
     
+    各阶段输出保存在 data/pipeline/<日期>/，失败后再次运行会从最后成功的阶段继续
+    
     Args:
         force: 是否强制运行（无视交易日检查）
+        fresh: 是否丢弃今天已保存的阶段输出，从头运行
     """
     logger.info("="*60)
     logger.info("开始执行每日研报生成任务")
@@ -67,27 +166,22 @@ def run_daily_report(force: bool = False):
     logger.info(f"强制模式: {force}")
     
     try:
-        # 检查是否为交易日
-        if not force and not is_trading_day():
-            logger.info("今天不是交易日，跳过研报生成")
-            return False
+        pipeline = build_pipeline(force, load_pipeline_config())
+        run_id = datetime.now().strftime('%Y-%m-%d')
+        if fresh:
+            pipeline.clear(run_id)
         
-        # 导入并运行研报生成器
-        from src.report_generator import ReportGenerator
-        
-        logger.info("初始化研报生成器...")
-        generator = ReportGenerator()
-        
-        logger.info("获取市场数据...")
-        data = generator.fetch_all_data()
+        status, results = pipeline.run(run_id)
         
-        logger.info("生成研报（含AI分析）...")
-        report = generator.generate_report(data)
-        
-        logger.info("保存研报...")
-        filepath = generator.save_report(report)
+        if status == 'skipped':
+            logger.info(results['calendar'].error or "流程已终止")
+            return False
+        if status != 'success':
+            failed = [name for name, r in results.items() if r.status == 'failed']
+            logger.error(f"❌ 研报生成失败，失败阶段: {', '.join(failed)}（再次运行将从失败处继续）")
+            return False
         
-        logger.info(f"✅ 研报生成成功: {filepath}")
+        logger.info(f"✅ 研报生成成功: {results['save'].output}")
         
         # 可以在这里添加通知功能
         # send_notification(f"研报已生成: {filepath}")
@@ -143,6 +237,7 @@ if __name__ == "__main__":
 示例:
   python cron_job.py --run-once          # 立即运行一次（自动判断交易日）
   python cron_job.py --run-once --force  # 强制立即运行
+  python cron_job.py --run-once --fresh  # 从头运行（默认从上次失败的阶段继续）
   python cron_job.py                     # 持续运行，工作日12:00自动执行
         """
     )
@@ -157,6 +252,11 @@ if __name__ == "__main__":
         action='store_true', 
         help='强制运行，无视交易日检查'
     )
+    parser.add_argument(
+        '--fresh',
+        action='store_true',
+        help='丢弃今天已保存的阶段输出，从头运行'
+    )
     parser.add_argument(
         '--test',
         action='store_true',
@@ -175,24 +275,15 @@ if __name__ == "__main__":
         print(f"Python: {sys.executable}")
         print(f"工作目录: {os.getcwd()}")
         
-        # 检查必要的库
-        try:
-            import akshare
-            print(f"✅ akshare: {akshare.__version__}")
-        except ImportError:
-            print("❌ akshare: 未安装")
-        
-        try:
-            import openai
-            print(f"✅ openai: {openai.__version__}")
-        except ImportError:
-            print("⚠️  openai: 未安装（将使用模板生成报告）")
-        
-        try:
-            import yaml
-            print("✅ pyyaml: 已安装")
-        except ImportError:
-            print("❌ pyyaml: 未安装")
+        # 检查必要的库（只读取安装信息，不导入，akshare 导入需要数秒）
+        from importlib.metadata import version, PackageNotFoundError
+        for package, missing in (('akshare', "❌ akshare: 未安装"),
+                                 ('openai', "⚠️  openai: 未安装（将使用模板生成报告）"),
+                                 ('pyyaml', "❌ pyyaml: 未安装")):
+            try:
+                print(f"✅ {package}: {version(package)}")
+            except PackageNotFoundError:
+                print(missing)
         
         # 检查API密钥
         api_key = os.getenv('OPENAI_API_KEY')
@@ -207,11 +298,23 @@ if __name__ == "__main__":
         else:
             print("⚠️  config.yaml: 不存在")
         
+        # 检查冷启动导入耗时
+        import time
+        start = time.perf_counter()
+        from src.pipeline import Pipeline
+        from src.report_generator import ReportGenerator
+        elapsed = (time.perf_counter() - start) * 1000
+        heavy = [m for m in ('pandas', 'akshare', 'yfinance', 'openai') if m in sys.modules]
+        if heavy:
+            print(f"⚠️  启动导入: {elapsed:.0f} ms，提前加载了 {', '.join(heavy)}")
+        else:
+            print(f"✅ 启动导入: {elapsed:.0f} ms")
+        
         print("="*60)
         
     elif args.run_once:
         # 立即运行一次
-        success = run_daily_report(force=args.force)
+        success = run_daily_report(force=args.force, fresh=args.fresh)
         sys.exit(0 if success else 1)
         
     else:
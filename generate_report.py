@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
-import json
 import os
 from datetime import datetime
 
+from src.market_schema import save_snapshot
+
 today = datetime.now().strftime("%Y-%m-%d")
 report_dir = f"reports/{today}"
 os.makedirs(report_dir, exist_ok=True)
@@ -155,7 +156,7 @@ AI算力指数今日下跌2.15%，连续第二日调整。
 with open(f"{report_dir}/report.md", "w", encoding='utf-8') as f:
     f.write(report)
 
-with open(f"{report_dir}/data.json", "w", encoding='utf-8') as f:
-    json.dump(data, f, indent=2, ensure_ascii=False)
+# 按当前数据格式保存
+save_snapshot(f"{report_dir}/data.json", data)
 
 print(f"✅ 报告已生成: {report_dir}/report.md")
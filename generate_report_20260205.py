@@ -3,18 +3,18 @@
 生成2026-02-05研报
 """
 
-import json
 from datetime import datetime
 
-# 读取数据
-with open('reports/2026-02-05/data_2026-02-05.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
+from src.market_schema import load_snapshot
+
+# 读取数据（统一结构，见 src/market_schema.py）
+data = load_snapshot('reports/2026-02-05/data_2026-02-05.json')
 
 # 生成研报
 report = f"""# 2026-02-05 每日市场观察
 
 **分析师：FinClaw AI 研究所**  
-**数据时间：{data['update_time']}**
+**数据时间：{data.update_time}**
 
 ---
 
@@ -22,10 +22,10 @@ report = f"""# 2026-02-05 每日市场观察
 
 | 市场 | 涨跌 | 关键判断 |
 |------|------|----------|
-| **上证指数** | {data['a_share']['上证指数']['change_pct']:+.2f}% | 震荡调整，金融护盘 |
-| **深证成指** | {data['a_share']['深证成指']['change_pct']:+.2f}% | 成长股承压回调 |
-| **创业板指** | {data['a_share']['创业板指']['change_pct']:+.2f}% | 新能源拖累走弱 |
-| **纳斯达克** | {data['us_stock']['纳斯达克']['change_pct']:+.2f}% | 科技股反弹走强 |
+| **上证指数** | {data.a_share['上证指数'].change_pct:+.2f}% | 震荡调整，金融护盘 |
+| **深证成指** | {data.a_share['深证成指'].change_pct:+.2f}% | 成长股承压回调 |
+| **创业板指** | {data.a_share['创业板指'].change_pct:+.2f}% | 新能源拖累走弱 |
+| **纳斯达克** | {data.us_stock['纳斯达克'].change_pct:+.2f}% | 科技股反弹走强 |
 | **黄金** | - | 避险情绪回落，金价调整 |
 
 ---
@@ -33,27 +33,27 @@ report = f"""# 2026-02-05 每日市场观察
 ## A股大盘分析
 
 ### 行情回顾
-今日A股三大指数全线收跌。上证指数跌{abs(data['a_share']['上证指数']['change_pct']):.2f}%收于{data['a_share']['上证指数']['price']:.2f}点；深证成指跌{abs(data['a_share']['深证成指']['change_pct']):.2f}%收于{data['a_share']['深证成指']['price']:.2f}点；创业板指跌{abs(data['a_share']['创业板指']['change_pct']):.2f}%收于{data['a_share']['创业板指']['price']:.2f}点。
+今日A股三大指数全线收跌。上证指数跌{abs(data.a_share['上证指数'].change_pct):.2f}%收于{data.a_share['上证指数'].price:.2f}点；深证成指跌{abs(data.a_share['深证成指'].change_pct):.2f}%收于{data.a_share['深证成指'].price:.2f}点；创业板指跌{abs(data.a_share['创业板指'].change_pct):.2f}%收于{data.a_share['创业板指'].price:.2f}点。
 
 **关键数据**：
-- 上证指数：{data['a_share']['上证指数']['price']:.2f}点（{data['a_share']['上证指数']['change_pct']:+.2f}%）
-- 深证成指：{data['a_share']['深证成指']['price']:.2f}点（{data['a_share']['深证成指']['change_pct']:+.2f}%）
-- 创业板指：{data['a_share']['创业板指']['price']:.2f}点（{data['a_share']['创业板指']['change_pct']:+.2f}%）
+- 上证指数：{data.a_share['上证指数'].price:.2f}点（{data.a_share['上证指数'].change_pct:+.2f}%）
+- 深证成指：{data.a_share['深证成指'].price:.2f}点（{data.a_share['深证成指'].change_pct:+.2f}%）
+- 创业板指：{data.a_share['创业板指'].price:.2f}点（{data.a_share['创业板指'].change_pct:+.2f}%）
 - 两市成交：约1.75万亿元
 
 ### 板块表现
 **领涨板块**：
 """
 
-for i, sector in enumerate(data['sectors']['top_gainers'][:5]):
-    report += f"- {sector['板块名称']}：{sector['涨跌幅']:+.2f}%\n"
+for i, sector in enumerate(data.top_gainers[:5]):
+    report += f"- {sector.name}：{sector.change_pct:+.2f}%\n"
 
 report += """
 **领跌板块**：
 """
 
-for i, sector in enumerate(data['sectors']['top_losers'][:5]):
-    report += f"- {sector['板块名称']}：{sector['涨跌幅']:+.2f}%\n"
+for i, sector in enumerate(data.top_losers[:5]):
+    report += f"- {sector.name}：{sector.change_pct:+.2f}%\n"
 
 report += f"""
 ### 市场特征
@@ -69,9 +69,9 @@ report += f"""
 
 | 指数 | 收盘 | 涨跌 | 涨跌幅 |
 |------|------|------|--------|
-| 道琼斯 | {data['us_stock']['道琼斯']['price']:,.2f} | {data['us_stock']['道琼斯']['change']:+.2f} | {data['us_stock']['道琼斯']['change_pct']:+.2f}% |
-| 标普500 | {data['us_stock']['标普500']['price']:,.2f} | {data['us_stock']['标普500']['change']:+.2f} | {data['us_stock']['标普500']['change_pct']:+.2f}% |
-| 纳斯达克 | {data['us_stock']['纳斯达克']['price']:,.2f} | {data['us_stock']['纳斯达克']['change']:+.2f} | {data['us_stock']['纳斯达克']['change_pct']:+.2f}% |
+| 道琼斯 | {data.us_stock['道琼斯'].price:,.2f} | {data.us_stock['道琼斯'].change:+.2f} | {data.us_stock['道琼斯'].change_pct:+.2f}% |
+| 标普500 | {data.us_stock['标普500'].price:,.2f} | {data.us_stock['标普500'].change:+.2f} | {data.us_stock['标普500'].change_pct:+.2f}% |
+| 纳斯达克 | {data.us_stock['纳斯达克'].price:,.2f} | {data.us_stock['纳斯达克'].change:+.2f} | {data.us_stock['纳斯达克'].change_pct:+.2f}% |
 
 **驱动因素**：
 1. 美联储官员讲话释放鸽派信号，6月降息预期升温
@@ -167,7 +167,7 @@ with open(report_path, 'w', encoding='utf-8') as f:
 
 print(f"✅ 研报已生成: {report_path}")
 print(f"\n报告摘要:")
-print(f"- A股：上证指数 {data['a_share']['上证指数']['change_pct']:+.2f}%")
-print(f"- 美股：纳斯达克 {data['us_stock']['纳斯达克']['change_pct']:+.2f}%")
-print(f"- 领涨：{data['sectors']['top_gainers'][0]['板块名称']} (+{data['sectors']['top_gainers'][0]['涨跌幅']:.2f}%)")
-print(f"- 领跌：{data['sectors']['top_losers'][0]['板块名称']} ({data['sectors']['top_losers'][0]['涨跌幅']:.2f}%)")
+print(f"- A股：上证指数 {data.a_share['上证指数'].change_pct:+.2f}%")
+print(f"- 美股：纳斯达克 {data.us_stock['纳斯达克'].change_pct:+.2f}%")
+print(f"- 领涨：{data.top_gainers[0].name} (+{data.top_gainers[0].change_pct:.2f}%)")
+print(f"- 领跌：{data.top_losers[0].name} ({data.top_losers[0].change_pct:.2f}%)")
@@ -1,5 +1,32 @@
-from .data_fetcher import data_fetcher
-from .technical_analysis import technical_analyzer
-from .report_generator import ReportGenerator
+import sys
+import types
+import importlib
+
+# 导出对象: 名称 -> 所在模块；首次访问时才导入对应模块（避免 import src 即加载 pandas 等依赖）
+_EXPORTS = {
+    'data_fetcher': '.data_fetcher',
+    'technical_analyzer': '.technical_analysis',
+    'ReportGenerator': '.report_generator'
+}
 
 __all__ = ['data_fetcher', 'technical_analyzer', 'ReportGenerator']
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class _Package(types.ModuleType):
+    """导入子模块 src.data_fetcher 后，导入机制会把同名包属性设为子模块本身；忽略这次赋值，始终导出单例"""
+
+    def __setattr__(self, name, value):
+        if name in _EXPORTS and isinstance(value, types.ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
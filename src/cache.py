@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+数据缓存模块
+带过期时间(TTL)和按内存字节数淘汰(LRU)的缓存，供DataFetcher使用
+"""
+
+import sys
+import time
+import inspect
+import threading
+import functools
+import dataclasses
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+_MISSING = object()
+
+
+def _frame_types() -> tuple:
+    """pandas 的 DataFrame/Series 类型；pandas 尚未导入时不可能出现这类对象，不为此导入"""
+    pd = sys.modules.get('pandas')
+    return (pd.DataFrame, pd.Series) if pd is not None else ()
+
+
+def estimate_size(value: Any) -> int:
+    """估算对象占用的内存字节数"""
+    frame_types = _frame_types()
+    if isinstance(value, frame_types):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(value, frame_types[0]) else int(usage)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return sys.getsizeof(value) + estimate_size(vars(value))
+    return sys.getsizeof(value)
+
+
+def is_empty(value: Any) -> bool:
+    """判断结果是否为空（空结果通常意味着获取失败，不缓存）"""
+    if value is None:
+        return True
+    if isinstance(value, _frame_types()):
+        return value.empty
+    if isinstance(value, (dict, list, tuple)):
+        return len(value) == 0
+    return False
+
+
+def copy_value(value: Any) -> Any:
+    """返回给调用方的副本：DataFrame/Series 及字典、列表逐层复制，调用方修改不影响缓存"""
+    if isinstance(value, _frame_types()):
+        return value.copy()
+    if isinstance(value, dict):
+        return {k: copy_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [copy_value(v) for v in value]
+    return value
+
+
+def make_key(name: str, args: tuple, kwargs: dict) -> Hashable:
+    """根据方法名和参数生成缓存键"""
+    def freeze(v):
+        if isinstance(v, dict):
+            return tuple(sorted((k, freeze(x)) for k, x in v.items()))
+        if isinstance(v, (list, tuple, set)):
+            return tuple(freeze(x) for x in v)
+        return v
+    return (name, freeze(args), freeze(kwargs))
+
+
+class TTLCache:
+    """TTL + LRU 缓存（线程安全）"""
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, default_ttl: float = 60):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (value, expires_at, size)
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """读取缓存，过期或不存在时返回default"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at, size = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """写入缓存，超出容量时按最近最少使用淘汰"""
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            expires_at = time.monotonic() + (self.default_ttl if ttl is None else ttl)
+            self._data[key] = (value, expires_at, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """删除并返回缓存项"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            self._remove(key)
+            return entry[0]
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存命中统计"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._data),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+    def _remove(self, key: Hashable):
+        value, expires_at, size = self._data.pop(key)
+        self._bytes -= size
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and entry[1] > time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def cached(category: str) -> Callable:
+    """
+    方法缓存装饰器
+
+    被装饰方法所在对象需提供 self.cache (TTLCache) 和 self.cache_ttl (类别 -> 秒)。
+    调用时可传入 refresh=True 跳过缓存强制重新获取；空结果不缓存。
+    参数按函数签名绑定后生成缓存键（f(5) 与 f(days=5) 命中同一项），返回缓存内容的副本。
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(self, *args, refresh: bool = False, **kwargs):
+            try:
+                bound = signature.bind(self, *args, **kwargs)
+            except TypeError:
+                return func(self, *args, **kwargs)  # 参数错误由原函数报出
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            arguments.pop(next(iter(signature.parameters)))
+            key = make_key(func.__name__, (), arguments)
+            if not refresh:
+                value = self.cache.get(key, _MISSING)
+                if value is not _MISSING:
+                    return copy_value(value)
+            value = func(self, *args, **kwargs)
+            if not is_empty(value):
+                self.cache.set(key, value, ttl=self.cache_ttl.get(category))
+                return copy_value(value)
+            return value
+        return wrapper
+    return decorator
@@ -4,70 +4,105 @@
 支持A股、纳斯达克、黄金、AI板块、红利板块数据获取
 """
 
-import akshare as ak
-import yfinance as yf
 import pandas as pd
-import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
-import requests
-import json
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from .cache import TTLCache, cached
+    from .ohlcv_store import OHLCVStore
+    from .fixtures import market_provider
+except ImportError:
+    from cache import TTLCache, cached
+    from ohlcv_store import OHLCVStore
+    from fixtures import market_provider
+
+# 数据源（支持录制/回放，见 fixtures.py；首次调用时才导入）
+ak = market_provider('akshare')
+yf = market_provider('yfinance')
 
 
 class DataFetcher:
     """金融数据获取器"""
     
-    def __init__(self):
-        self.cache = {}
+    # 各类数据的缓存有效期（秒）
+    CACHE_TTL = {
+        'spot': 30,              # 实时行情
+        'history': 4 * 3600,     # 日线历史
+        'dividend': 3 * 86400,   # 分红数据
+        'news': 300              # 新闻
+    }
+    
+    def __init__(self, cache_max_bytes: int = 256 * 1024 * 1024,
+                 cache_ttl: Optional[Dict[str, float]] = None,
+                 store: Optional[OHLCVStore] = None):
+        self.cache = TTLCache(max_bytes=cache_max_bytes)
+        self.cache_ttl = {**self.CACHE_TTL, **(cache_ttl or {})}
+        self.store = store if store is not None else OHLCVStore()
         
     # ==================== A股数据 ====================
     
-    def get_a_share_index(self) -> pd.DataFrame:
+    # A股主要指数: 代码 -> 名称
+    A_SHARE_INDICES = {
+        "000001": "上证指数",
+        "399001": "深证成指",
+        "399006": "创业板指",
+        "000300": "沪深300",
+        "000905": "中证500",
+        "000016": "上证50"
+    }
+    
+    @cached('spot')
+    def get_index_spot_snapshot(self) -> pd.DataFrame:
+        """获取指数实时行情快照（以代码为索引，每次刷新只下载一次）"""
+        df = ak.stock_zh_index_spot_em()
+        return df.drop_duplicates('代码').set_index('代码')
+    
+    def get_a_share_index(self, indices: Optional[Dict[str, str]] = None,
+                          refresh: bool = False) -> pd.DataFrame:
         """获取A股主要指数行情"""
+        if indices is None:
+            indices = self.A_SHARE_INDICES
         try:
-            # 上证指数、深证成指、创业板指
-            indices = {
-                "000001": "上证指数",
-                "399001": "深证成指", 
-                "399006": "创业板指",
-                "000300": "沪深300",
-                "000905": "中证500",
-                "000016": "上证50"
-            }
+            snapshot = self.get_index_spot_snapshot(refresh=refresh)
+            rows = snapshot.reindex(list(indices.keys())).dropna(subset=['最新价'])
+            if rows.empty:
+                return pd.DataFrame()
             
-            data = []
-            for code, name in indices.items():
-                df = ak.stock_zh_index_spot_em()
-                row = df[df['代码'] == code]
-                if not row.empty:
-                    data.append({
-                        'code': code,
-                        'name': name,
-                        'price': float(row['最新价'].values[0]),
-                        'change': float(row['涨跌额'].values[0]),
-                        'change_pct': float(row['涨跌幅'].values[0]),
-                        'volume': float(row['成交量'].values[0]),
-                        'amount': float(row['成交额'].values[0])
-                    })
-            return pd.DataFrame(data)
+            return pd.DataFrame({
+                'code': rows.index,
+                'name': [indices[code] for code in rows.index],
+                'price': rows['最新价'].astype(float).values,
+                'change': rows['涨跌额'].astype(float).values,
+                'change_pct': rows['涨跌幅'].astype(float).values,
+                'volume': rows['成交量'].astype(float).values,
+                'amount': rows['成交额'].astype(float).values
+            })
         except Exception as e:
             print(f"获取A股指数失败: {e}")
             return pd.DataFrame()
     
+    @cached('history')
     def get_a_share_daily(self, symbol: str, days: int = 60) -> pd.DataFrame:
-        """获取A股个股历史数据"""
-        try:
+        """获取A股个股历史数据（本地存储，增量下载）"""
+        def fetch(start: datetime, end: datetime) -> pd.DataFrame:
             df = ak.stock_zh_a_hist(symbol=symbol, period="daily", 
-                                    start_date=(datetime.now() - timedelta(days=days)).strftime("%Y%m%d"),
-                                    end_date=datetime.now().strftime("%Y%m%d"),
+                                    start_date=start.strftime("%Y%m%d"),
+                                    end_date=end.strftime("%Y%m%d"),
                                     adjust="qfq")
             df.columns = ['date', 'open', 'close', 'high', 'low', 'volume', 'amount', 
                          'amplitude', 'change_pct', 'change', 'turnover']
             return df
+        
+        try:
+            return self.store.update(f"a_share/{symbol}", fetch, date_col='date', price_col='close', days=days,
+                                     date_format='%Y-%m-%d')
         except Exception as e:
             print(f"获取A股数据失败 {symbol}: {e}")
             return pd.DataFrame()
     
+    @cached('spot')
     def get_sector_flow(self, sector: str = "行业板块") -> pd.DataFrame:
         """获取板块资金流向"""
         try:
@@ -82,19 +117,30 @@ class DataFetcher:
     
     # ==================== 纳斯达克数据 ====================
     
-    def get_nasdaq_data(self, symbols: List[str], period: str = "1mo") -> Dict[str, pd.DataFrame]:
-        """获取纳斯达克相关数据"""
-        data = {}
-        for symbol in symbols:
-            try:
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(period=period)
-                if not hist.empty:
-                    data[symbol] = hist
-            except Exception as e:
-                print(f"获取{symbol}失败: {e}")
-        return data
+    @cached('history')
+    def get_nasdaq_data(self, symbols: List[str], period: str = "1mo",
+                        max_workers: int = 8) -> Dict[str, pd.DataFrame]:
+        """获取纳斯达克相关数据（多个代码并发下载）"""
+        if not symbols:
+            return {}
+        workers = max(1, min(max_workers, len(symbols)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='yfinance') as executor:
+            results = executor.map(lambda symbol: self._fetch_yf_history(symbol, period), symbols)
+            # 保持输入代码顺序
+            return {symbol: hist for symbol, hist in zip(symbols, results) if hist is not None}
+    
+    @staticmethod
+    def _fetch_yf_history(symbol: str, period: str) -> Optional[pd.DataFrame]:
+        """下载单个代码的历史行情"""
+        try:
+            hist = yf.Ticker(symbol).history(period=period)
+            if not hist.empty:
+                return hist
+        except Exception as e:
+            print(f"获取{symbol}失败: {e}")
+        return None
     
+    @cached('spot')
     def get_nasdaq_overview(self) -> Dict:
         """获取纳斯达克整体概览"""
         try:
@@ -127,20 +173,24 @@ class DataFetcher:
     
     # ==================== 黄金数据 ====================
     
+    @cached('spot')
     def get_gold_price(self) -> Dict:
         """获取黄金价格数据"""
         try:
             # COMEX黄金期货
-            gc = yf.Ticker("GC=F")
-            gc_hist = gc.history(period="1mo")
-            gc_info = gc.info
+            def fetch_gc(start: datetime, end: datetime) -> pd.DataFrame:
+                # yfinance的end不包含当天
+                hist = yf.Ticker("GC=F").history(start=start.strftime("%Y-%m-%d"),
+                                                 end=(end + timedelta(days=1)).strftime("%Y-%m-%d"))
+                return hist.reset_index()
+            
+            gc_hist = self.store.update("yf/GC=F", fetch_gc, date_col='Date', price_col='Close', days=30)
+            if not gc_hist.empty:
+                gc_hist = gc_hist.set_index('Date')
             
             # 国内黄金ETF
             try:
-                gold_etf = ak.fund_etf_hist_em(symbol="518880", period="daily",
-                                               start_date=(datetime.now() - timedelta(days=30)).strftime("%Y%m%d"),
-                                               end_date=datetime.now().strftime("%Y%m%d"),
-                                               adjust="qfq")
+                gold_etf = self._get_etf_history("518880", days=30)
             except:
                 gold_etf = pd.DataFrame()
             
@@ -163,6 +213,7 @@ class DataFetcher:
     
     # ==================== AI板块数据 ====================
     
+    @cached('history')
     def get_ai_sector_a_share(self) -> pd.DataFrame:
         """获取A股AI板块数据"""
         try:
@@ -173,6 +224,7 @@ class DataFetcher:
             print(f"获取AI板块失败: {e}")
             return pd.DataFrame()
     
+    @cached('spot')
     def get_ai_leaders(self) -> pd.DataFrame:
         """获取AI板块龙头股"""
         try:
@@ -184,14 +236,15 @@ class DataFetcher:
             print(f"获取AI龙头股失败: {e}")
             return pd.DataFrame()
     
-    def get_ai_us_stocks(self, symbols: List[str] = None) -> Dict[str, pd.DataFrame]:
+    def get_ai_us_stocks(self, symbols: List[str] = None, refresh: bool = False) -> Dict[str, pd.DataFrame]:
         """获取美股AI概念股"""
         if symbols is None:
             symbols = ["NVDA", "AMD", "AVGO", "CRM", "PLTR", "SMCI"]
-        return self.get_nasdaq_data(symbols, period="1mo")
+        return self.get_nasdaq_data(symbols, period="1mo", refresh=refresh)
     
     # ==================== 红利板块数据 ====================
     
+    @cached('history')
     def get_dividend_etfs(self) -> Dict[str, pd.DataFrame]:
         """获取红利ETF数据"""
         etfs = {
@@ -202,15 +255,23 @@ class DataFetcher:
         data = {}
         for code, name in etfs.items():
             try:
-                df = ak.fund_etf_hist_em(symbol=code, period="daily",
-                                         start_date=(datetime.now() - timedelta(days=60)).strftime("%Y%m%d"),
-                                         end_date=datetime.now().strftime("%Y%m%d"),
-                                         adjust="qfq")
-                data[name] = df
+                data[name] = self._get_etf_history(code, days=60)
             except Exception as e:
                 print(f"获取ETF {code} 失败: {e}")
         return data
     
+    def _get_etf_history(self, code: str, days: int) -> pd.DataFrame:
+        """获取场内ETF日线（本地存储，增量下载）"""
+        def fetch(start: datetime, end: datetime) -> pd.DataFrame:
+            return ak.fund_etf_hist_em(symbol=code, period="daily",
+                                       start_date=start.strftime("%Y%m%d"),
+                                       end_date=end.strftime("%Y%m%d"),
+                                       adjust="qfq")
+        
+        return self.store.update(f"etf/{code}", fetch, date_col='日期', price_col='收盘', days=days,
+                                 date_format='%Y-%m-%d')
+    
+    @cached('dividend')
     def get_dividend_stocks(self) -> pd.DataFrame:
         """获取高分红股票排行"""
         try:
@@ -222,8 +283,15 @@ class DataFetcher:
             print(f"获取分红数据失败: {e}")
             return pd.DataFrame()
     
+    # ==================== 缓存 ====================
+    
+    def get_cache_stats(self) -> Dict:
+        """获取缓存命中统计"""
+        return self.cache.stats()
+    
     # ==================== 新闻数据 ====================
     
+    @cached('news')
     def get_financial_news(self, limit: int = 20) -> List[Dict]:
         """获取财经新闻"""
         try:
@@ -242,6 +310,7 @@ class DataFetcher:
             print(f"获取新闻失败: {e}")
             return []
     
+    @cached('news')
     def get_sector_news(self, sector: str) -> List[Dict]:
         """获取板块相关新闻"""
         try:
@@ -262,8 +331,17 @@ class DataFetcher:
             return []
 
 
-# 单例模式
-data_fetcher = DataFetcher()
+_data_fetcher: Optional[DataFetcher] = None
+
+
+def __getattr__(name: str):
+    """单例模式（首次访问 data_fetcher 时才创建）"""
+    global _data_fetcher
+    if name == 'data_fetcher':
+        if _data_fetcher is None:
+            _data_fetcher = DataFetcher()
+        return _data_fetcher
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
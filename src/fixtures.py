@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+外部数据调用录制/回放
+录制模式下把 akshare、yfinance、新浪行情的返回结果保存到带版本号的目录，
+回放模式下从磁盘读取（可模拟延迟），用于离线复现和性能对比
+
+环境变量：
+  MARKET_FIXTURES=record|replay|off     模式，默认off
+  MARKET_FIXTURES_DIR=data/fixtures     录制目录
+  MARKET_FIXTURES_VERSION=v1            录制版本（子目录）
+  MARKET_FIXTURES_LATENCY=0|0.2|recorded  回放延迟（秒），recorded表示按录制时的耗时
+"""
+
+import os
+import re
+import json
+import time
+import pickle
+import hashlib
+import importlib
+import threading
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Optional
+
+
+# 日期参数按窗口天数寻址：回放时无论哪天运行都能命中录制结果，
+# 而全量下载和增量下载（窗口长度不同）对应各自的录制
+DATE_RANGES = (('start_date', 'end_date'), ('start', 'end'))
+
+
+def _parse_date(value: Any) -> Optional[date]:
+    """日期参数（datetime、'20240105'、'2024-01-05'）转为日期，无法识别时返回None"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        text = value.strip()
+        try:
+            if len(text) == 8 and text.isdigit():
+                return datetime.strptime(text, '%Y%m%d').date()
+            return date.fromisoformat(text[:10])
+        except ValueError:
+            return None
+    return None
+
+
+def window_kwargs(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """把成对的起止日期参数换成窗口天数（缺少结束日期时按今天计），其余参数不变"""
+    addressed = dict(kwargs)
+    for start_key, end_key in DATE_RANGES:
+        if start_key not in addressed:
+            continue
+        start = _parse_date(addressed[start_key])
+        end = _parse_date(addressed[end_key]) if end_key in addressed else date.today()
+        if start is None or end is None:
+            continue
+        addressed.pop(start_key)
+        addressed.pop(end_key, None)
+        addressed[f"{start_key}~{end_key}"] = f"{(end - start).days}d"
+    return addressed
+
+
+class FixtureMissingError(LookupError):
+    """回放模式下找不到录制结果"""
+
+
+class FixtureStore:
+    """录制结果存储"""
+
+    def __init__(self, mode: str = "off", base_dir: str = "data/fixtures",
+                 version: str = "v1", latency: str = "0"):
+        self.configure(mode, base_dir, version, latency)
+        self._lock = threading.Lock()
+
+    def configure(self, mode: str = "off", base_dir: str = "data/fixtures",
+                  version: str = "v1", latency: str = "0"):
+        """设置模式、目录、版本和回放延迟"""
+        if mode not in ('off', 'record', 'replay'):
+            raise ValueError(f"未知的录制模式: {mode}")
+        self.mode = mode
+        self.base_dir = base_dir
+        self.version = version
+        self.latency = latency
+
+    @classmethod
+    def from_env(cls) -> 'FixtureStore':
+        return cls(
+            mode=os.getenv('MARKET_FIXTURES', 'off'),
+            base_dir=os.getenv('MARKET_FIXTURES_DIR', 'data/fixtures'),
+            version=os.getenv('MARKET_FIXTURES_VERSION', 'v1'),
+            latency=os.getenv('MARKET_FIXTURES_LATENCY', '0')
+        )
+
+    @property
+    def directory(self) -> str:
+        return os.path.join(self.base_dir, self.version)
+
+    def path(self, call_path: str, args: tuple, kwargs: Dict[str, Any]) -> str:
+        """调用对应的录制文件（不含扩展名）"""
+        addressed = window_kwargs(kwargs)
+        payload = json.dumps([call_path, list(args), addressed], ensure_ascii=False, sort_keys=True, default=str)
+        digest = hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]
+        namespace, _, name = call_path.partition('.')
+        safe_name = re.sub(r'[^\w.-]+', '_', name)[:80]
+        return os.path.join(self.directory, namespace, f"{safe_name}-{digest}")
+
+    def call(self, call_path: str, func: Callable, args: tuple = (), kwargs: Optional[Dict[str, Any]] = None) -> Any:
+        """按当前模式执行、录制或回放一次外部调用"""
+        kwargs = kwargs or {}
+        if self.mode == 'off':
+            return func(*args, **kwargs)
+        path = self.path(call_path, args, kwargs)
+        if self.mode == 'replay':
+            return self._replay(call_path, path)
+
+        start = time.perf_counter()
+        error = None
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            result, error = None, e
+        self._save(path, call_path, args, kwargs, result, error, time.perf_counter() - start)
+        if error is not None:
+            raise error
+        return result
+
+    def _save(self, path: str, call_path: str, args: tuple, kwargs: Dict[str, Any],
+              result: Any, error: Optional[BaseException], duration: float):
+        try:
+            payload = pickle.dumps({'result': result, 'error': error}, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            payload = pickle.dumps({'result': None, 'error': RuntimeError(repr(error or result))})
+        meta = {
+            'call': call_path,
+            'args': args,
+            'kwargs': kwargs,
+            'duration': round(duration, 4),
+            'error': repr(error) if error else None,
+            'recorded_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(f"{path}.pkl", 'wb') as f:
+                f.write(payload)
+            with open(f"{path}.json", 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False, indent=2, default=str)
+
+    def _replay(self, call_path: str, path: str) -> Any:
+        try:
+            with open(f"{path}.pkl", 'rb') as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            raise FixtureMissingError(f"未找到录制结果: {call_path} ({path})")
+
+        if self.latency == 'recorded':
+            try:
+                with open(f"{path}.json", 'r', encoding='utf-8') as f:
+                    time.sleep(json.load(f).get('duration', 0))
+            except (OSError, ValueError):
+                pass
+        elif float(self.latency) > 0:
+            time.sleep(float(self.latency))
+
+        if entry['error'] is not None:
+            raise entry['error']
+        return entry['result']
+
+
+class _CallProxy:
+    """可调用对象代理：每次调用经过录制/回放"""
+
+    def __init__(self, store: FixtureStore, call_path: str, resolve: Callable[[], Any]):
+        self._store = store
+        self._call_path = call_path
+        self._resolve = resolve
+
+    def __call__(self, *args, **kwargs):
+        return self._store.call(self._call_path, lambda *a, **k: self._resolve()(*a, **k), args, kwargs)
+
+
+class _ObjectProxy:
+    """工厂返回对象的代理（如 yf.Ticker(symbol)），方法和属性分别录制"""
+
+    def __init__(self, store: FixtureStore, call_path: str, create: Callable[[], Any]):
+        self._store = store
+        self._call_path = call_path
+        self._create = create
+        self._obj = None
+
+    def _real(self):
+        if self._obj is None:
+            self._obj = self._create()
+        return self._obj
+
+    def __getattr__(self, attr: str):
+        call_path = f"{self._call_path}.{attr}"
+        store = self._store
+        if store.mode == 'replay':
+            # 属性（如info）按无参调用录制，存在即直接返回
+            if os.path.exists(f"{store.path(call_path, (), {})}.pkl"):
+                return store.call(call_path, None)
+            return _CallProxy(store, call_path, lambda: None)
+        value = getattr(self._real(), attr)
+        if callable(value):
+            return _CallProxy(store, call_path, lambda: value)
+        return store.call(call_path, lambda: value)
+
+
+class ProviderProxy:
+    """
+    数据源模块代理
+
+    mode=off 时直接转发到真实模块（首次使用时才导入）；
+    record/replay 时函数调用经过 FixtureStore，replay 不导入真实模块。
+    """
+
+    # 返回对象而非数据的工厂函数
+    FACTORIES = {'yfinance.Ticker'}
+
+    def __init__(self, name: str, store: FixtureStore):
+        self._name = name
+        self._store = store
+        self._module = None
+
+    def _real(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str):
+        if self._store.mode == 'off':
+            return getattr(self._real(), attr)
+        call_path = f"{self._name}.{attr}"
+        if call_path in self.FACTORIES:
+            def factory(*args, **kwargs):
+                label = ','.join([repr(a) for a in args] + [f"{k}={v!r}" for k, v in sorted(kwargs.items())])
+                return _ObjectProxy(self._store, f"{call_path}({label})",
+                                    lambda: getattr(self._real(), attr)(*args, **kwargs))
+            return factory
+        return _CallProxy(self._store, call_path, lambda: getattr(self._real(), attr))
+
+
+# 单例模式
+fixture_store = FixtureStore.from_env()
+
+
+def market_provider(name: str) -> ProviderProxy:
+    """获取数据源模块（akshare / yfinance），支持录制和回放"""
+    return ProviderProxy(name, fixture_store)
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+历史行情仓库
+把各日期的数据快照（reports/*/data*.json）整理为按月分区的列式表（Feather），
+保存数据时增量更新；提供多日查询，供Web页面和提示词使用
+
+表：
+  indices   date, market, name, price, change, change_pct   （A股/美股指数）
+  sectors   date, side, rank, name, change_pct              （领涨/领跌板块）
+  gold      date, name, price, change, change_pct
+  dividend  date, rank, code, name, weight                  （红利低波50成分股）
+
+使用方式：
+  python src/history_warehouse.py --rebuild      # 从 reports/ 重建
+  python src/history_warehouse.py --index 上证指数 --days 200
+"""
+
+import os
+import glob
+import json
+import argparse
+import threading
+import importlib.util
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+try:
+    from .market_schema import MarketSnapshot, load_snapshot, migrate
+    from .report_catalog import DATA_FILES
+    from .lazy import lazy_import
+except ImportError:
+    from market_schema import MarketSnapshot, load_snapshot, migrate
+    from report_catalog import DATA_FILES
+    from lazy import lazy_import
+
+# 首次读写表时才导入（Web页面启动时不加载）
+pd = lazy_import('pandas')
+feather = lazy_import('pyarrow.feather')
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+
+TABLES = {
+    'indices': ['date', 'market', 'name', 'price', 'change', 'change_pct'],
+    'sectors': ['date', 'side', 'rank', 'name', 'change_pct'],
+    'gold': ['date', 'name', 'price', 'change', 'change_pct'],
+    'dividend': ['date', 'rank', 'code', 'name', 'weight']
+}
+
+# 数值列统一为float（缺失值为NaN）
+NUMERIC_COLUMNS = {'price', 'change', 'change_pct', 'weight'}
+
+
+def snapshot_rows(snapshot: MarketSnapshot) -> Dict[str, List[dict]]:
+    """把一个快照拆成各表的行"""
+    date = snapshot.date
+    rows = {table: [] for table in TABLES}
+    for market, quotes in (('a_share', snapshot.a_share), ('us_stock', snapshot.us_stock)):
+        for name, q in quotes.items():
+            rows['indices'].append({'date': date, 'market': market, 'name': name, 'price': q.price,
+                                    'change': q.change, 'change_pct': q.change_pct})
+    for side, moves in (('gainers', snapshot.top_gainers), ('losers', snapshot.top_losers)):
+        for rank, s in enumerate(moves, 1):
+            rows['sectors'].append({'date': date, 'side': side, 'rank': rank, 'name': s.name,
+                                    'change_pct': s.change_pct})
+    for name, q in snapshot.gold.items():
+        rows['gold'].append({'date': date, 'name': name, 'price': q.price,
+                             'change': q.change, 'change_pct': q.change_pct})
+    for rank, c in enumerate(snapshot.dividend_components, 1):
+        rows['dividend'].append({'date': date, 'rank': rank, 'code': c.code, 'name': c.name,
+                                 'weight': c.weight})
+    return rows
+
+
+class HistoryWarehouse:
+    """按月分区的列式历史表"""
+
+    def __init__(self, base_dir: str = "data/warehouse", report_dir: str = "./reports"):
+        self.base_dir = base_dir
+        self.report_dir = report_dir
+        self.enabled = HAS_PYARROW
+        self._lock = threading.Lock()
+
+    # ==================== 存储 ====================
+
+    def _path(self, table: str, month: str) -> str:
+        return os.path.join(self.base_dir, table, f"{month}.feather")
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.base_dir, "manifest.json")
+
+    def _read_manifest(self) -> Dict[str, float]:
+        try:
+            with open(self._manifest_path(), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_manifest(self, manifest: Dict[str, float]):
+        os.makedirs(self.base_dir, exist_ok=True)
+        tmp_path = f"{self._manifest_path()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, sort_keys=True)
+        os.replace(tmp_path, self._manifest_path())
+
+    def _read_partition(self, table: str, month: str) -> 'pd.DataFrame':
+        path = self._path(table, month)
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=TABLES[table])
+        return feather.read_table(path, memory_map=True).to_pandas()
+
+    def _write_partition(self, table: str, month: str, df: 'pd.DataFrame'):
+        path = self._path(table, month)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        feather.write_feather(df.reset_index(drop=True), tmp_path, compression='uncompressed')
+        os.replace(tmp_path, path)
+
+    def _replace_dates(self, snapshots: List[MarketSnapshot]):
+        """按月分组写入，同一日期的旧行被替换"""
+        by_month: Dict[str, List[MarketSnapshot]] = {}
+        for snapshot in snapshots:
+            if snapshot.date:
+                by_month.setdefault(snapshot.date[:7], []).append(snapshot)
+
+        for month, group in by_month.items():
+            dates = {s.date for s in group}
+            new_rows = {table: [] for table in TABLES}
+            for snapshot in group:
+                for table, rows in snapshot_rows(snapshot).items():
+                    new_rows[table].extend(rows)
+            for table, columns in TABLES.items():
+                stored = self._read_partition(table, month)
+                stored = stored[~stored['date'].isin(dates)]
+                new = pd.DataFrame(new_rows[table], columns=columns)
+                parts = [df for df in (stored, new) if not df.empty]
+                merged = pd.concat(parts, ignore_index=True) if parts else new
+                for col in NUMERIC_COLUMNS.intersection(columns):
+                    merged[col] = pd.to_numeric(merged[col], errors='coerce').astype(float)
+                self._write_partition(table, month, merged.sort_values('date', kind='stable'))
+
+    # ==================== 写入 ====================
+
+    def ingest(self, data, source_mtime: Optional[float] = None):
+        """写入一个快照（任意版本的字典或 MarketSnapshot），保存数据后调用"""
+        if not self.enabled:
+            return
+        snapshot = data if isinstance(data, MarketSnapshot) else migrate(data)
+        if not snapshot.date:
+            return
+        with self._lock:
+            self._replace_dates([snapshot])
+            manifest = self._read_manifest()
+            manifest[snapshot.date] = source_mtime or 0
+            self._write_manifest(manifest)
+
+    def sync(self, rebuild: bool = False) -> int:
+        """导入研报目录中新增或修改过的数据文件，返回导入数量"""
+        if not self.enabled:
+            return 0
+        with self._lock:
+            manifest = {} if rebuild else self._read_manifest()
+            if rebuild:
+                for table in TABLES:
+                    for path in glob.glob(os.path.join(self.base_dir, table, "*.feather")):
+                        os.remove(path)
+
+            changed = []
+            for date_str, path in sorted(self._data_files().items()):
+                mtime = os.stat(path).st_mtime
+                if manifest.get(date_str) == mtime:
+                    continue
+                snapshot = load_snapshot(path)
+                snapshot.date = snapshot.date or date_str
+                changed.append(snapshot)
+                manifest[date_str] = mtime
+
+            if changed:
+                self._replace_dates(changed)
+            self._write_manifest(manifest)
+            return len(changed)
+
+    def _data_files(self) -> Dict[str, str]:
+        """每个日期目录一个数据文件（按 DATA_FILES 优先级，与研报索引一致）"""
+        files = {}
+        for folder in glob.glob(os.path.join(self.report_dir, '*')):
+            date_str = os.path.basename(folder)
+            for pattern in DATA_FILES:
+                path = os.path.join(folder, pattern.format(date=date_str))
+                if os.path.isfile(path):
+                    files[date_str] = path
+                    break
+        return files
+
+    # ==================== 查询 ====================
+
+    def table(self, name: str, start: Optional[str] = None, end: Optional[str] = None) -> 'pd.DataFrame':
+        """读取一张表，按日期范围（YYYY-MM-DD，均包含）只读取涉及的月份分区"""
+        columns = TABLES[name]
+        if not self.enabled:
+            return pd.DataFrame(columns=columns)
+        months = sorted(os.path.basename(p)[:-len('.feather')]
+                        for p in glob.glob(os.path.join(self.base_dir, name, "*.feather")))
+        months = [m for m in months if (not start or m >= start[:7]) and (not end or m <= end[:7])]
+        frames = [self._read_partition(name, m) for m in months]
+        frames = [df for df in frames if not df.empty]
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        df = pd.concat(frames, ignore_index=True)
+        if start:
+            df = df[df['date'] >= start]
+        if end:
+            df = df[df['date'] <= end]
+        return df.reset_index(drop=True)
+
+    def index_history(self, name: str, days: Optional[int] = None,
+                      end: Optional[str] = None) -> 'pd.DataFrame':
+        """某个指数的逐日价格和涨跌幅；days 为最近的记录天数"""
+        start = _days_before(end, days * 2) if days and end else None  # 交易日约为自然日的七成
+        df = self.table('indices', start, end)
+        df = df[df['name'] == name][['date', 'price', 'change', 'change_pct']]
+        if days:
+            df = df.tail(days)
+        return df.reset_index(drop=True)
+
+    def sector_leader_counts(self, side: str = 'gainers', top: int = 1,
+                             start: Optional[str] = None, end: Optional[str] = None) -> 'pd.Series':
+        """各板块进入领涨（gainers）/领跌（losers）前top名的天数"""
+        df = self.table('sectors', start, end)
+        df = df[(df['side'] == side) & (df['rank'] <= top)]
+        return df['name'].value_counts()
+
+    def context_text(self, end: str, days: int = 5) -> str:
+        """最近几个交易日（不含end当天）主要指数的走势，用于提示词"""
+        df = self.table('indices', start=_days_before(end, max(days * 2, 21)))
+        df = df[df['date'] < end]
+        dates = sorted(df['date'].unique())[-days:]
+        if not dates:
+            return ""
+        df = df[df['date'].isin(dates)]
+        lines = [f"近{len(dates)}个交易日走势："]
+        for name, group in df.groupby('name', sort=False):
+            moves = "、".join(f"{d[5:]} {p:+.2f}%" for d, p in zip(group['date'], group['change_pct'])
+                             if pd.notna(p))
+            if moves:
+                lines.append(f"{name}: {moves}")
+        return "\n".join(lines) if len(lines) > 1 else ""
+
+
+def _days_before(end: str, days: int) -> str:
+    """end（YYYY-MM-DD）之前 days 个自然日的日期"""
+    return (datetime.strptime(end[:10], '%Y-%m-%d') - timedelta(days=days)).strftime('%Y-%m-%d')
+
+
+# 单例模式（首次使用时才读取文件）
+history_warehouse = HistoryWarehouse()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='历史行情仓库')
+    parser.add_argument('--rebuild', action='store_true', help='从研报目录全部重建')
+    parser.add_argument('--report-dir', default='reports')
+    parser.add_argument('--index', help='查询指数历史，如 上证指数')
+    parser.add_argument('--days', type=int, default=20)
+    args = parser.parse_args()
+
+    warehouse = HistoryWarehouse(report_dir=args.report_dir)
+    count = warehouse.sync(rebuild=args.rebuild)
+    print(f"导入 {count} 个数据文件")
+    if args.index:
+        print(warehouse.index_history(args.index, days=args.days).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
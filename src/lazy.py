@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+延迟导入
+模块在首次访问其属性时才导入，启动时（Streamlit页面、cron_job.py --test）
+不加载用不到的 pandas / requests 等重型依赖
+"""
+
+import importlib
+import threading
+from typing import Any, Optional
+
+
+class LazyModule:
+    """模块代理，首次访问属性时导入"""
+
+    def __init__(self, name: str, package: Optional[str] = None):
+        self._name = name
+        self._package = package
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    if self._package:
+                        self._module = importlib.import_module(f".{self._name}", self._package)
+                    else:
+                        self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "已导入" if self._module is not None else "未导入"
+        return f"<LazyModule {self._name} ({state})>"
+
+
+def lazy_import(name: str, package: Optional[str] = None) -> LazyModule:
+    """
+    延迟导入模块
+
+    package 传入调用方的 __package__ 时按包内相对导入；
+    以脚本方式运行（__package__ 为空）时按顶层模块导入，与各模块的 try/except 导入方式一致。
+    """
+    return LazyModule(name, package)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+AI分析结果缓存
+按模型、温度、接口地址和提示词哈希寻址的磁盘缓存，命中时按原分块回放流式输出
+"""
+
+import os
+import json
+import time
+import hashlib
+from typing import Any, Dict, List, Optional
+
+
+class LLMResponseCache:
+    """LLM流式响应磁盘缓存"""
+
+    def __init__(self, cache_dir: str = "data/llm_cache", ttl_hours: float = 24, enabled: bool = True):
+        self.cache_dir = cache_dir
+        self.ttl = ttl_hours * 3600
+        self.enabled = enabled
+
+    @staticmethod
+    def make_key(model: str, temperature: float, messages: List[Dict[str, str]], **params: Any) -> str:
+        """根据模型、温度、消息和其他请求参数生成缓存键"""
+        payload = json.dumps(
+            {'model': model, 'temperature': temperature, 'messages': messages, 'params': params},
+            ensure_ascii=False, sort_keys=True
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[List[str]]:
+        """读取缓存的分块，未命中或已过期返回None"""
+        if not self.enabled:
+            return None
+        path = self.path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if self.ttl > 0 and time.time() - entry.get('created', 0) > self.ttl:
+            return None
+        return entry.get('chunks')
+
+    def put(self, key: str, chunks: List[str], **meta: Any):
+        """写入完整的分块列表"""
+        if not self.enabled:
+            return
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'created': time.time(), 'chunks': chunks, **meta}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+后台行情刷新
+每个服务进程一个刷新线程，按间隔获取最新行情快照，所有Web会话共享；
+并发的刷新请求合并为一次获取（single-flight），会话直接读取当前快照
+"""
+
+import time
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+try:
+    from .lazy import lazy_import
+    from .pipeline import is_empty_output
+    from .registry import get_config
+except ImportError:
+    from lazy import lazy_import
+    from pipeline import is_empty_output
+    from registry import get_config
+
+# 首次刷新时才导入
+report_generator = lazy_import('report_generator', __package__)
+
+# 行情分区：全部为空说明本次获取失败（获取方法内部吞掉了网络错误），不发布
+MARKET_SECTIONS = ('a_share', 'us_stock', 'sectors', 'dividend_index', 'gold')
+
+
+def fetch_market_data() -> Dict[str, Any]:
+    """获取一次全市场数据（不写入当天的数据文件）"""
+    return report_generator.ReportGenerator().fetch_all_data(save=False)
+
+
+class MarketRefresher:
+    """
+    共享行情快照
+
+    快照在会话间共享，调用方只读不改；每次刷新发布一个新字典。
+    最近 idle_timeout 秒内没有会话读取时后台线程暂停刷新，下次读取时恢复。
+    """
+
+    def __init__(self, fetch: Callable[[], Dict[str, Any]] = fetch_market_data,
+                 interval: float = 60, max_age: float = 120, idle_timeout: float = 600,
+                 config_path: Optional[str] = "config.yaml"):
+        self.fetch = fetch
+        self.interval = interval
+        self.max_age = max_age
+        self.idle_timeout = idle_timeout
+        self.config_path = config_path
+        self.fetch_count = 0
+        self._data: Optional[Dict[str, Any]] = None
+        self._fetched_at: Optional[float] = None      # time.monotonic()
+        self._fetched_time: Optional[datetime] = None
+        self._error: Optional[str] = None
+        self._inflight: Optional[Future] = None
+        self._last_read = time.monotonic()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def configure(self, config_path: str = "config.yaml"):
+        """读取 config.yaml 中的 refresher 配置（覆盖构造参数）"""
+        config = get_config(config_path).get('refresher', {}) or {}
+        self.interval = config.get('interval', self.interval)
+        self.max_age = config.get('max_age', self.max_age)
+        self.idle_timeout = config.get('idle_timeout', self.idle_timeout)
+
+    # ==================== 刷新 ====================
+
+    def refresh(self, wait: bool = True, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        刷新快照；已有刷新在进行时不再发起新的获取，等待同一次的结果
+
+        Args:
+            wait: 是否等待结果
+            timeout: 等待秒数，超时抛出 concurrent.futures.TimeoutError（获取在后台继续）
+        """
+        with self._lock:
+            future = self._inflight
+            leader = future is None
+            if leader:
+                future = self._inflight = Future()
+        if leader:
+            threading.Thread(target=self._run, args=(future,), name='market-refresh', daemon=True).start()
+        return future.result(timeout) if wait else None
+
+    def _run(self, future: Future):
+        try:
+            data = self.fetch()
+            if all(is_empty_output(data.get(key)) for key in MARKET_SECTIONS):
+                raise ValueError("行情数据全部为空，保留上次快照")
+        except Exception as e:
+            with self._lock:
+                self._error = f"{type(e).__name__}: {e}"
+                self._inflight = None
+                self.fetch_count += 1
+            future.set_exception(e)
+            return
+        with self._lock:
+            self._data = data
+            self._fetched_at = time.monotonic()
+            self._fetched_time = datetime.now()
+            self._error = None
+            self._inflight = None
+            self.fetch_count += 1
+        future.set_result(data)
+
+    # ==================== 后台线程 ====================
+
+    def start(self):
+        """启动后台刷新线程（已启动时忽略），启动时读取配置"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if self.config_path:
+                self.configure(self.config_path)
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='market-refresher', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.wait(self._next_delay()):
+            if self.config_path:
+                self.configure(self.config_path)  # config.yaml 修改后生效
+            if time.monotonic() - self._last_read > self.idle_timeout:
+                continue
+            try:
+                self.refresh(wait=True)
+            except Exception as e:
+                print(f"后台刷新行情失败: {e}")
+
+    def _next_delay(self) -> float:
+        age = self.age()
+        if age is None:
+            return self.interval
+        return max(1.0, self.interval - age)
+
+    # ==================== 读取 ====================
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        当前快照
+
+        已有快照时立即返回（超过 max_age 时同时在后台刷新）；
+        进程内还没有快照时等待首次获取。
+        """
+        self._last_read = time.monotonic()
+        self.start()
+        with self._lock:
+            data, age = self._data, self.age()
+        if data is None:
+            return self.refresh(wait=True, timeout=timeout)
+        if age > self.max_age:
+            self.refresh(wait=False)
+        return data
+
+    def age(self) -> Optional[float]:
+        """快照距今秒数，尚无快照时为None"""
+        fetched_at = self._fetched_at
+        return time.monotonic() - fetched_at if fetched_at is not None else None
+
+    def status(self) -> Dict[str, Any]:
+        """刷新状态（用于页面显示）"""
+        age = self.age()
+        return {
+            'fetched_at': self._fetched_time.strftime('%H:%M:%S') if self._fetched_time else None,
+            'age': round(age, 1) if age is not None else None,
+            'refreshing': self._inflight is not None,
+            'error': self._error,
+            'fetch_count': self.fetch_count
+        }
+
+
+# 单例模式（首次读取时启动后台线程）
+market_refresher = MarketRefresher()
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+市场数据快照格式
+带版本号的统一数据结构，历史数据文件一次遍历迁移到当前版本；
+优先使用 orjson 读写
+
+历史版本：
+  0  timestamp + a_share.shanghai/shenzhen/chinext (close)，nasdaq.price，gold.price_usd
+  1  a_share.sh_index/sz_index/cy_index (close)，nasdaq.close，gold.close (元/克)
+  2  按中文名称索引 (上证指数/price)，sectors.top_gainers/top_losers，无版本号
+  3  当前版本：同2，带 schema_version 字段，数值统一为float
+
+使用方式：
+  python src/market_schema.py reports/            # 检查各文件版本
+  python src/market_schema.py reports/ --migrate  # 原地迁移到当前版本
+"""
+
+import os
+import json
+import glob
+import argparse
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+SCHEMA_VERSION = 3
+
+A_SHARE_INDICES = ['上证指数', '深证成指', '创业板指']
+US_INDICES = ['道琼斯', '标普500', '纳斯达克']
+
+# 旧版本键名 -> 名称
+LEGACY_A_SHARE_KEYS = {
+    'sh_index': '上证指数', 'sz_index': '深证成指', 'cy_index': '创业板指',
+    'shanghai': '上证指数', 'shenzhen': '深证成指', 'chinext': '创业板指'
+}
+
+
+def _indicator_value(value: Any) -> Any:
+    """技术指标值：数值（含 numpy 标量）转为float，信号文字等原样保留"""
+    if hasattr(value, 'item') and not isinstance(value, (str, bytes)):
+        value = value.item()
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return value
+
+
+def _float(value: Any) -> Optional[float]:
+    if value is None or value == '' or value == '-':
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class Quote:
+    """指数/品种行情"""
+    price: Optional[float] = None
+    change: Optional[float] = None
+    change_pct: Optional[float] = None
+    volume: Optional[float] = None
+    amount: Optional[float] = None
+    name: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> 'Quote':
+        return cls(
+            price=_float(raw.get('price', raw.get('close', raw.get('price_usd')))),
+            change=_float(raw.get('change')),
+            change_pct=_float(raw.get('change_pct')),
+            volume=_float(raw.get('volume')),
+            amount=_float(raw.get('amount')),
+            name=raw.get('name')
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {k: v for k, v in self.__dict__.items() if v is not None}
+
+
+@dataclass
+class SectorMove:
+    """板块涨跌"""
+    name: str
+    change_pct: Optional[float]
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> 'SectorMove':
+        return cls(
+            name=raw.get('板块名称', raw.get('name', '-')),
+            change_pct=_float(raw.get('涨跌幅', raw.get('change_pct')))
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'板块名称': self.name, '涨跌幅': self.change_pct}
+
+
+@dataclass
+class Component:
+    """指数成分股"""
+    code: str
+    name: str
+    weight: Optional[float]
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> 'Component':
+        return cls(
+            code=str(raw.get('成分券代码', raw.get('code', '-'))),
+            name=raw.get('成分券名称', raw.get('name', '-')),
+            weight=_float(raw.get('权重', raw.get('weight')))
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'成分券代码': self.code, '成分券名称': self.name, '权重': self.weight}
+
+
+@dataclass
+class MarketSnapshot:
+    """单日市场数据快照"""
+    date: str = ""
+    update_time: Optional[str] = None
+    a_share: Dict[str, Quote] = field(default_factory=dict)
+    us_stock: Dict[str, Quote] = field(default_factory=dict)
+    gold: Dict[str, Quote] = field(default_factory=dict)
+    top_gainers: List[SectorMove] = field(default_factory=list)
+    top_losers: List[SectorMove] = field(default_factory=list)
+    dividend_name: Optional[str] = None
+    dividend_components: List[Component] = field(default_factory=list)
+    indicators: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    source_version: int = SCHEMA_VERSION
+
+    def to_dict(self) -> Dict[str, Any]:
+        """当前版本的字典格式（与 ReportGenerator.fetch_all_data 返回的结构一致）"""
+        data = {
+            'schema_version': SCHEMA_VERSION,
+            'date': self.date,
+            'update_time': self.update_time,
+            'a_share': {name: q.to_dict() for name, q in self.a_share.items()},
+            'us_stock': {name: q.to_dict() for name, q in self.us_stock.items()},
+            'sectors': {},
+            'dividend_index': {},
+            'gold': {name: q.to_dict() for name, q in self.gold.items()}
+        }
+        if self.top_gainers or self.top_losers:
+            data['sectors'] = {
+                'top_gainers': [s.to_dict() for s in self.top_gainers],
+                'top_losers': [s.to_dict() for s in self.top_losers]
+            }
+        if self.dividend_name or self.dividend_components:
+            data['dividend_index'] = {
+                'name': self.dividend_name,
+                'top_components': [c.to_dict() for c in self.dividend_components]
+            }
+        if self.indicators:
+            data['indicators'] = self.indicators
+        return data
+
+
+def detect_version(raw: Dict[str, Any]) -> Optional[int]:
+    """识别数据文件的版本，空数据返回None"""
+    if not raw:
+        return None
+    if 'schema_version' in raw:
+        return int(raw['schema_version'])
+    a_share = raw.get('a_share', {})
+    if 'timestamp' in raw or any(k in a_share for k in ('shanghai', 'shenzhen', 'chinext')):
+        return 0
+    if any(k in a_share for k in ('sh_index', 'sz_index', 'cy_index')) or 'nasdaq' in raw:
+        return 1
+    return 2
+
+
+def _legacy_sectors(sectors: Dict[str, Any]) -> Tuple[List[SectorMove], List[SectorMove]]:
+    """{板块: {change_pct}} -> 按涨跌幅排序的领涨/领跌列表"""
+    moves = [SectorMove(name, _float(v.get('change_pct') if isinstance(v, dict) else v))
+             for name, v in sectors.items()]
+    moves = [m for m in moves if m.change_pct is not None]
+    gainers = sorted((m for m in moves if m.change_pct >= 0), key=lambda m: -m.change_pct)
+    losers = sorted((m for m in moves if m.change_pct < 0), key=lambda m: m.change_pct)
+    return gainers, losers
+
+
+def migrate(raw: Dict[str, Any]) -> MarketSnapshot:
+    """把任意版本的数据一次转换为当前结构"""
+    version = detect_version(raw)
+    snapshot = MarketSnapshot(source_version=version if version is not None else SCHEMA_VERSION)
+    if not raw:
+        return snapshot
+
+    snapshot.date = raw.get('date') or str(raw.get('timestamp', ''))[:10]
+    snapshot.update_time = raw.get('update_time') or (
+        raw['timestamp'].replace('T', ' ') if raw.get('timestamp') else None)
+
+    for key, quote in raw.get('a_share', {}).items():
+        if isinstance(quote, dict):
+            snapshot.a_share[LEGACY_A_SHARE_KEYS.get(key, key)] = Quote.from_dict(quote)
+
+    if version is not None and version <= 1:
+        if raw.get('nasdaq'):
+            snapshot.us_stock['纳斯达克'] = Quote.from_dict(raw['nasdaq'])
+        gold = raw.get('gold') or {}
+        if gold:
+            # 版本0为美元/盎司，版本1为元/克
+            name = 'XAU' if 'price_usd' in gold or gold.get('unit') == 'USD/oz' else 'AU9999'
+            snapshot.gold[name] = Quote.from_dict(gold)
+        snapshot.top_gainers, snapshot.top_losers = _legacy_sectors(raw.get('sectors') or {})
+        return snapshot
+
+    for name, quote in (raw.get('us_stock') or {}).items():
+        snapshot.us_stock[name] = Quote.from_dict(quote)
+    for name, quote in (raw.get('gold') or {}).items():
+        snapshot.gold[name] = Quote.from_dict(quote)
+
+    sectors = raw.get('sectors') or {}
+    if 'top_gainers' in sectors or 'top_losers' in sectors:
+        snapshot.top_gainers = [SectorMove.from_dict(s) for s in sectors.get('top_gainers', [])]
+        snapshot.top_losers = [SectorMove.from_dict(s) for s in sectors.get('top_losers', [])]
+    else:
+        snapshot.top_gainers, snapshot.top_losers = _legacy_sectors(sectors)
+
+    dividend = raw.get('dividend_index') or {}
+    snapshot.dividend_name = dividend.get('name')
+    snapshot.dividend_components = [Component.from_dict(c) for c in dividend.get('top_components', [])]
+    snapshot.indicators = {
+        name: {k: _indicator_value(v) for k, v in signals.items()} if isinstance(signals, dict) else signals
+        for name, signals in (raw.get('indicators') or {}).items()
+    }
+    return snapshot
+
+
+# ==================== 读写 ====================
+
+def loads(content: bytes) -> Dict[str, Any]:
+    if HAS_ORJSON:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _json_default(value: Any) -> Any:
+    """numpy 标量等带 item() 的对象转为Python数值"""
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(data: Dict[str, Any], indent: bool = True) -> bytes:
+    if HAS_ORJSON:
+        option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(data, option=option, default=_json_default)
+    return json.dumps(data, ensure_ascii=False, indent=2 if indent else None,
+                      default=_json_default).encode('utf-8')
+
+
+def load_snapshot(path: str) -> MarketSnapshot:
+    """读取数据文件并转换为当前结构"""
+    with open(path, 'rb') as f:
+        return migrate(loads(f.read()))
+
+
+def save_snapshot(path: str, data: Dict[str, Any]):
+    """按当前版本保存（data 可以是任意版本的字典）"""
+    content = dumps(migrate(data).to_dict())
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def migrate_files(report_dir: str, write: bool = False) -> Dict[str, Optional[int]]:
+    """遍历 report_dir/*/data*.json，返回各文件原版本；write=True 时原地迁移"""
+    versions = {}
+    for path in sorted(glob.glob(os.path.join(report_dir, '*', 'data*.json'))):
+        with open(path, 'rb') as f:
+            raw = loads(f.read())
+        version = detect_version(raw)
+        versions[path] = version
+        if write and version != SCHEMA_VERSION:
+            save_snapshot(path, raw)
+    return versions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='市场数据文件版本检查/迁移')
+    parser.add_argument('report_dir', nargs='?', default='reports')
+    parser.add_argument('--migrate', action='store_true', help='原地迁移到当前版本')
+    args = parser.parse_args()
+
+    for path, version in migrate_files(args.report_dir, write=args.migrate).items():
+        status = "当前版本" if version == SCHEMA_VERSION else ("已迁移" if args.migrate else "需迁移")
+        print(f"{path}: v{version} {status}")
+
+
+if __name__ == "__main__":
+    main()
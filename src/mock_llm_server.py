@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+本地OpenAI兼容模拟服务
+实现 /v1/chat/completions（含流式SSE）和 /v1/models，用于离线压测研报生成流程
+
+使用方式：
+  python src/mock_llm_server.py --port 8765 --tokens-per-sec 40 --first-token-delay 1.5
+  LLM_BASE_URL=http://127.0.0.1:8765/v1 SILICONFLOW_API_KEY=mock python cron_job.py --run-once --force
+"""
+
+import json
+import time
+import uuid
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+
+DEFAULT_CONTENT = """### 1. A股大盘分析
+
+今日三大指数窄幅震荡，成交额维持在万亿上方，权重板块护盘明显，题材轮动加快。
+
+### 2. 美股市场分析
+
+隔夜美股涨跌互现，科技股分化，市场继续交易降息预期与财报指引。
+
+### 3. 行业板块分析
+
+领涨板块集中在消费与金融，领跌板块以有色和能源为主，风格偏向防御。
+
+### 4. 红利低波50指数分析
+
+红利低波指数走势稳健，银行、公用事业权重股贡献主要收益，股息率吸引力仍在。
+
+### 5. AI板块分析
+
+AI算力链短期波动加大，应用端关注度提升，龙头估值处于历史中高位。
+
+### 6. 黄金分析
+
+AU9999与国际金价同步调整，美元走强压制金价，中长期配置逻辑未变。
+
+### 7. 资金流向分析
+
+主力资金净流出成长板块，流入高股息与大金融，北向资金小幅净买入。
+
+### 8. 风险提示
+
+海外利率波动、地缘风险及业绩不及预期。
+
+### 9. 配置建议
+
+均衡配置红利与成长，逢低关注AI应用及黄金。
+"""
+
+
+def tokenize(text: str, chunk_chars: int = 2) -> List[str]:
+    """把文本切分为模拟token（按固定字数）"""
+    return [text[i:i + chunk_chars] for i in range(0, len(text), chunk_chars)]
+
+
+class MockOptions:
+    """模拟服务参数"""
+
+    def __init__(self, tokens_per_sec: float = 50, first_token_delay: float = 0.5,
+                 error_rate: float = 0.0, disconnect_rate: float = 0.0,
+                 content: str = DEFAULT_CONTENT, chunk_chars: int = 2, seed: Optional[int] = 0):
+        self.tokens_per_sec = tokens_per_sec
+        self.first_token_delay = first_token_delay
+        self.error_rate = error_rate
+        self.disconnect_rate = disconnect_rate
+        self.content = content
+        self.chunk_chars = chunk_chars
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def roll(self, rate: float) -> bool:
+        if rate <= 0:
+            return False
+        with self.lock:
+            return self.random.random() < rate
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """请求处理"""
+
+    protocol_version = "HTTP/1.1"
+    options: MockOptions = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip('/').endswith('/models'):
+            self._send_json(200, {'object': 'list', 'data': [{'id': 'mock-model', 'object': 'model'}]})
+        else:
+            self._send_json(404, {'error': {'message': 'not found', 'type': 'invalid_request_error'}})
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {'error': {'message': 'not found', 'type': 'invalid_request_error'}})
+            return
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+        opts = self.options
+
+        if opts.roll(opts.error_rate):
+            self._send_json(500, {'error': {'message': 'injected server error', 'type': 'server_error'}})
+            return
+
+        tokens = tokenize(opts.content, opts.chunk_chars)
+        max_tokens = body.get('max_tokens')
+        if max_tokens:
+            tokens = tokens[:max_tokens]
+        model = body.get('model', 'mock-model')
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+
+        time.sleep(opts.first_token_delay)
+        if body.get('stream'):
+            self._stream(completion_id, model, tokens)
+        else:
+            self._send_json(200, {
+                'id': completion_id,
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': model,
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': ''.join(tokens)},
+                    'finish_reason': 'stop'
+                }],
+                'usage': {'prompt_tokens': 0, 'completion_tokens': len(tokens), 'total_tokens': len(tokens)}
+            })
+
+    def _stream(self, completion_id: str, model: str, tokens: List[str]):
+        opts = self.options
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        disconnect_at = None
+        if opts.roll(opts.disconnect_rate) and tokens:
+            with opts.lock:
+                disconnect_at = opts.random.randrange(len(tokens))
+        interval = 1 / opts.tokens_per_sec if opts.tokens_per_sec > 0 else 0
+
+        def event(delta: dict, finish_reason=None) -> bytes:
+            payload = {
+                'id': completion_id,
+                'object': 'chat.completion.chunk',
+                'created': int(time.time()),
+                'model': model,
+                'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}]
+            }
+            return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode('utf-8')
+
+        try:
+            self.wfile.write(event({'role': 'assistant', 'content': ''}))
+            for i, token in enumerate(tokens):
+                if i == disconnect_at:
+                    return
+                if i and interval:
+                    time.sleep(interval)
+                self.wfile.write(event({'content': token}))
+                self.wfile.flush()
+            self.wfile.write(event({}, 'stop'))
+            self.wfile.write(b"data: [DONE]\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _send_json(self, status: int, payload: dict):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class MockLLMServer:
+    """
+    后台线程运行的模拟服务
+
+    用法:
+        with MockLLMServer(tokens_per_sec=100) as server:
+            client = OpenAI(api_key="mock", base_url=server.base_url)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, **options):
+        handler = type('BoundMockHandler', (MockHandler,), {'options': MockOptions(**options)})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> 'MockLLMServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> 'MockLLMServer':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地OpenAI兼容模拟服务')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--tokens-per-sec', type=float, default=50, help='输出速度')
+    parser.add_argument('--first-token-delay', type=float, default=0.5, help='首个token延迟（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='返回500错误的概率')
+    parser.add_argument('--disconnect-rate', type=float, default=0.0, help='流式输出中途断开的概率')
+    parser.add_argument('--content-file', help='固定返回内容的文件')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    args = parser.parse_args()
+
+    content = DEFAULT_CONTENT
+    if args.content_file:
+        with open(args.content_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+
+    server = MockLLMServer(
+        args.host, args.port,
+        tokens_per_sec=args.tokens_per_sec,
+        first_token_delay=args.first_token_delay,
+        error_rate=args.error_rate,
+        disconnect_rate=args.disconnect_rate,
+        content=content,
+        seed=args.seed
+    )
+    print(f"模拟服务已启动: {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+本地行情存储模块
+按代码分区的列式(Feather/Arrow)日线存储，只增量下载缺失的交易日
+"""
+
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+class OHLCVStore:
+    """本地列式日线存储"""
+
+    def __init__(self, base_dir: str = "data/ohlcv"):
+        self.base_dir = base_dir
+        self.enabled = HAS_PYARROW
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def path(self, key: str) -> str:
+        """代码对应的分区文件，key形如 a_share/000001"""
+        safe_key = key.replace('^', '_').replace('=', '_')
+        return os.path.join(self.base_dir, f"{safe_key}.feather")
+
+    def read(self, key: str) -> pd.DataFrame:
+        """读取全部已存储数据（内存映射）"""
+        return self._read(key)[0]
+
+    def _read(self, key: str) -> Tuple[pd.DataFrame, Optional[datetime]]:
+        """读取数据和已下载窗口的起始日期（covered_from，早于首根K线时说明更早的日期本就没有数据）"""
+        path = self.path(key)
+        if not self.enabled or not os.path.exists(path):
+            return pd.DataFrame(), None
+        table = feather.read_table(path, memory_map=True)
+        covered = (table.schema.metadata or {}).get(b'covered_from')
+        covered_from = datetime.fromisoformat(covered.decode()) if covered else None
+        return table.to_pandas(), covered_from
+
+    def append(self, key: str, new: pd.DataFrame, date_col: str,
+               covered_from: Optional[datetime] = None) -> pd.DataFrame:
+        """追加新K线，同一日期以新数据为准"""
+        new = self._normalize(new, date_col)
+        stored, stored_from = self._read(key)
+        if not stored.empty:
+            new = pd.concat([stored, new], ignore_index=True)
+        merged = (new.drop_duplicates(subset=[date_col], keep='last')
+                     .sort_values(date_col)
+                     .reset_index(drop=True))
+        self._write(key, merged, covered_from or stored_from)
+        return merged
+
+    def update(self, key: str, fetch: Callable[[datetime, datetime], pd.DataFrame],
+               date_col: str, price_col: str, days: int,
+               date_format: Optional[str] = None) -> pd.DataFrame:
+        """
+        增量更新并返回最近days天的数据
+
+        Args:
+            key: 分区键
+            fetch: 下载函数 fetch(start, end) -> DataFrame
+            date_col: 日期列名
+            price_col: 收盘价列名，用于检测复权变化
+            days: 返回的窗口天数
+            date_format: 返回的日期列格式化为字符串（如 '%Y-%m-%d'），默认为时间戳
+        """
+        end = datetime.now()
+        window_start = end - timedelta(days=days)
+        if not self.enabled:
+            return self._format(self._normalize(fetch(window_start, end), date_col), date_col, date_format)
+
+        with self._lock(key):
+            stored, covered_from = self._read(key)
+            if covered_from is None and not stored.empty:
+                covered_from = stored[date_col].iloc[0].tz_localize(None).to_pydatetime()
+            anchor = None
+            if not stored.empty and len(stored) >= 2:
+                # 从倒数第二根K线开始下载：最后一根可能是盘中数据，
+                # 倒数第二根已收盘，用来校验复权价格是否变化
+                anchor = stored.iloc[-2]
+                if anchor[date_col].tz_localize(None) < window_start:
+                    anchor = None
+
+            if anchor is None:
+                merged = self._replace(key, fetch(window_start, end), date_col, window_start)
+                covered_from = window_start
+            else:
+                try:
+                    new = self._normalize(fetch(anchor[date_col].tz_localize(None).to_pydatetime(), end), date_col)
+                except Exception as e:
+                    print(f"增量更新失败 {key}: {e}，使用本地数据")
+                    new = pd.DataFrame()
+
+                if new.empty:
+                    merged = stored
+                elif self._adjusted(anchor, new, date_col, price_col):
+                    # 复权因子变化，历史价格需整体重新下载
+                    merged = self._replace(key, fetch(window_start, end), date_col, window_start)
+                    covered_from = window_start
+                else:
+                    merged = self.append(key, new, date_col)
+
+                if not merged.empty and covered_from > window_start:
+                    # 请求的窗口比已下载的更长，补下载更早的部分
+                    first = merged[date_col].iloc[0].tz_localize(None).to_pydatetime()
+                    try:
+                        older = fetch(window_start, first)
+                    except Exception as e:
+                        print(f"补充历史数据失败 {key}: {e}，使用本地数据")
+                    else:
+                        merged = self.append(key, older, date_col, covered_from=window_start)
+
+        if merged.empty:
+            return merged
+        dates = merged[date_col]
+        cutoff = pd.Timestamp(window_start)
+        if dates.dt.tz is not None:
+            cutoff = cutoff.tz_localize(dates.dt.tz)
+        return self._format(merged[dates >= cutoff].reset_index(drop=True), date_col, date_format)
+
+    def _replace(self, key: str, df: pd.DataFrame, date_col: str,
+                 covered_from: Optional[datetime] = None) -> pd.DataFrame:
+        """用新下载的窗口覆盖本地分区"""
+        df = self._normalize(df, date_col)
+        if df.empty:
+            return df
+        df = df.drop_duplicates(subset=[date_col], keep='last').sort_values(date_col).reset_index(drop=True)
+        self._write(key, df, covered_from)
+        return df
+
+    @staticmethod
+    def _adjusted(anchor: pd.Series, new: pd.DataFrame, date_col: str, price_col: str) -> bool:
+        """已收盘K线的价格与本地不一致，说明发生了复权"""
+        if price_col not in new.columns:
+            return False
+        row = new[new[date_col] == anchor[date_col]]
+        if row.empty:
+            return False
+        old_price = float(anchor[price_col])
+        new_price = float(row[price_col].iloc[0])
+        return abs(new_price - old_price) > 1e-6 * max(abs(old_price), 1.0)
+
+    @staticmethod
+    def _format(df: pd.DataFrame, date_col: str, date_format: Optional[str]) -> pd.DataFrame:
+        if not date_format or df.empty or date_col not in df.columns:
+            return df
+        df = df.copy()
+        df[date_col] = df[date_col].dt.strftime(date_format)
+        return df
+
+    @staticmethod
+    def _normalize(df: pd.DataFrame, date_col: str) -> pd.DataFrame:
+        if df.empty or date_col not in df.columns:
+            return df
+        df = df.copy()
+        df[date_col] = pd.to_datetime(df[date_col])
+        return df
+
+    def _write(self, key: str, df: pd.DataFrame, covered_from: Optional[datetime] = None):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if covered_from is not None:
+            metadata = {**(table.schema.metadata or {}), b'covered_from': covered_from.isoformat().encode()}
+            table = table.replace_schema_metadata(metadata)
+        # 不压缩，便于内存映射读取
+        feather.write_feather(table, tmp_path, compression='uncompressed')
+        os.replace(tmp_path, path)
+
+    def _lock(self, key: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+阶段依赖图执行器
+按依赖关系调度各阶段，无依赖关系的阶段并发执行；每个阶段有独立的超时和重试策略，
+输出按运行ID持久化，失败后重新运行时从最后成功的阶段继续
+"""
+
+import os
+import json
+import time
+import pickle
+import threading
+from concurrent.futures import Future, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class StageSkip(Exception):
+    """阶段主动终止整个流程（如非交易日），不视为失败"""
+
+
+class StageTimeout(Exception):
+    """阶段执行超时（不重试：超时的线程仍可能在运行，重试会重复执行）"""
+
+
+class StageEmpty(Exception):
+    """阶段输出为空（如数据获取阶段内部吞掉了网络错误）"""
+
+
+def is_empty_output(value: Any) -> bool:
+    """None、空容器，或各个值均为空的字典"""
+    if value is None:
+        return True
+    if isinstance(value, dict):
+        return all(is_empty_output(v) for v in value.values())
+    if isinstance(value, (list, tuple, set, str)):
+        return len(value) == 0
+    return False
+
+
+@dataclass
+class Stage:
+    """
+    流程阶段
+
+    func 接收 {依赖阶段名: 输出} 字典并返回本阶段输出。
+    optional 阶段失败时流程继续，下游收到 None。
+    persist 为 False 的阶段（如持有连接的对象）每次运行都重新执行；空输出从不持久化。
+    allow_empty 为 False 时空输出按失败处理（可重试）。
+    cancellable 为 True 时 func 额外接收一个 threading.Event，超时后被置位，阶段应尽快停止。
+    """
+    name: str
+    func: Callable[[Dict[str, Any]], Any]
+    deps: Tuple[str, ...] = ()
+    timeout: Optional[float] = None
+    retries: int = 0
+    retry_delay: float = 2.0
+    optional: bool = False
+    persist: bool = True
+    allow_empty: bool = True
+    cancellable: bool = False
+
+
+@dataclass
+class StageResult:
+    """阶段执行结果"""
+    name: str
+    status: str = "pending"  # pending/done/reused/failed/skipped
+    attempts: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+    output: Any = field(default=None, repr=False)
+
+
+class Pipeline:
+    """阶段依赖图"""
+
+    def __init__(self, stages: List[Stage], state_dir: str = "data/pipeline",
+                 max_workers: int = 6, log: Callable[[str], None] = print):
+        self.stages = {stage.name: stage for stage in stages}
+        self.state_dir = state_dir
+        self.max_workers = max_workers
+        self.log = log
+        self._check_graph()
+
+    def _check_graph(self):
+        """检查未知依赖和循环依赖"""
+        for stage in self.stages.values():
+            for dep in stage.deps:
+                if dep not in self.stages:
+                    raise ValueError(f"阶段 {stage.name} 依赖未定义的阶段 {dep}")
+        visited, visiting = set(), set()
+
+        def visit(name: str):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"阶段存在循环依赖: {name}")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    # ==================== 持久化 ====================
+
+    def run_dir(self, run_id: str) -> str:
+        return os.path.join(self.state_dir, run_id)
+
+    def _output_path(self, run_id: str, name: str) -> str:
+        return os.path.join(self.run_dir(run_id), f"{name}.pkl")
+
+    def _load_output(self, run_id: str, name: str) -> Tuple[bool, Any]:
+        try:
+            with open(self._output_path(run_id, name), 'rb') as f:
+                return True, pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return False, None
+
+    def _save_output(self, run_id: str, name: str, output: Any):
+        path = self._output_path(run_id, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, 'wb') as f:
+            pickle.dump(output, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def _save_status(self, run_id: str, status: str, results: Dict[str, StageResult]):
+        os.makedirs(self.run_dir(run_id), exist_ok=True)
+        summary = {
+            'run_id': run_id,
+            'status': status,
+            'updated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'stages': {
+                name: {'status': r.status, 'attempts': r.attempts,
+                       'seconds': round(r.seconds, 3), 'error': r.error}
+                for name, r in results.items()
+            }
+        }
+        with open(os.path.join(self.run_dir(run_id), 'status.json'), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    def clear(self, run_id: str):
+        """删除某次运行的持久化输出"""
+        run_dir = self.run_dir(run_id)
+        if not os.path.isdir(run_dir):
+            return
+        for filename in os.listdir(run_dir):
+            os.remove(os.path.join(run_dir, filename))
+        os.rmdir(run_dir)
+
+    # ==================== 执行 ====================
+
+    def run(self, run_id: str, resume: bool = True) -> Tuple[str, Dict[str, StageResult]]:
+        """
+        执行全部阶段
+
+        Returns:
+            (状态, 各阶段结果)，状态为 success / failed / skipped
+        """
+        results = {name: StageResult(name) for name in self.stages}
+        if resume:
+            for name, stage in self.stages.items():
+                if stage.persist:
+                    found, output = self._load_output(run_id, name)
+                    # 旧版本可能保存过空输出，不复用
+                    if found and not is_empty_output(output):
+                        results[name].status = 'reused'
+                        results[name].output = output
+                        self.log(f"[{name}] 复用上次输出")
+
+        finished = {'done', 'reused', 'failed'}
+        status = 'success'
+        # future -> (阶段名, 开始时间, 截止时间, 取消信号)
+        running: Dict[Future, Tuple[str, float, Optional[float], threading.Event]] = {}
+        retry_at: Dict[str, float] = {}
+
+        try:
+            while True:
+                now = time.monotonic()
+                if status == 'success':
+                    for name, stage in self.stages.items():
+                        if len(running) >= self.max_workers:
+                            break
+                        result = results[name]
+                        if result.status != 'pending' or retry_at.get(name, 0) > now:
+                            continue
+                        if any(name == n for n, _, _, _ in running.values()):
+                            continue
+                        if not all(results[dep].status in finished for dep in stage.deps):
+                            continue
+                        inputs = {dep: results[dep].output for dep in stage.deps}
+                        result.attempts += 1
+                        deadline = now + stage.timeout if stage.timeout else None
+                        cancel = threading.Event()
+                        running[self._start(stage, inputs, cancel)] = (name, now, deadline, cancel)
+                        retry_at.pop(name, None)
+
+                if not running:
+                    if status != 'success' or not retry_at:
+                        break
+                    time.sleep(max(0.0, min(retry_at.values()) - time.monotonic()))
+                    continue
+
+                wake = [d for _, _, d, _ in running.values() if d is not None] + list(retry_at.values())
+                timeout = max(0.0, min(wake) - time.monotonic()) if wake else None
+                done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+
+                now = time.monotonic()
+                for future in list(running):
+                    name, started, deadline, cancel = running[future]
+                    if future in done:
+                        error = future.exception()
+                        if error is None and not self.stages[name].allow_empty \
+                                and is_empty_output(future.result()):
+                            error = StageEmpty("输出为空")
+                    elif deadline is not None and now >= deadline:
+                        # 线程无法强制终止：通知可取消的阶段停止，放弃其结果
+                        cancel.set()
+                        error = StageTimeout(f"超时（{self.stages[name].timeout}秒）")
+                    else:
+                        continue
+                    del running[future]
+                    result = results[name]
+                    result.seconds += now - started
+
+                    if error is None:
+                        result.status = 'done'
+                        result.error = None
+                        result.output = future.result()
+                        if self.stages[name].persist and not is_empty_output(result.output):
+                            self._save_output(run_id, name, result.output)
+                        self.log(f"[{name}] 完成 ({now - started:.1f}秒)")
+                    elif isinstance(error, StageSkip):
+                        result.status = 'skipped'
+                        result.error = str(error)
+                        status = 'skipped'
+                        self.log(f"[{name}] 终止流程: {error}")
+                    else:
+                        status = self._on_error(name, error, result, retry_at, status)
+        finally:
+            # 流程提前结束时通知仍在运行的阶段停止
+            for _, _, _, cancel in running.values():
+                cancel.set()
+
+        for result in results.values():
+            if result.status == 'pending':
+                result.status = 'skipped'
+        self._save_status(run_id, status, results)
+        return status, results
+
+    @staticmethod
+    def _start(stage: Stage, inputs: Dict[str, Any], cancel: threading.Event) -> Future:
+        """在守护线程中执行阶段：超时后被放弃的线程不会阻止进程退出"""
+        future = Future()
+        args = (inputs, cancel) if stage.cancellable else (inputs,)
+
+        def target():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(stage.func(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=target, name=f'stage-{stage.name}', daemon=True).start()
+        return future
+
+    def _on_error(self, name: str, error: BaseException, result: StageResult,
+                  retry_at: Dict[str, float], status: str) -> str:
+        stage = self.stages[name]
+        result.error = f"{type(error).__name__}: {error}"
+        retryable = not isinstance(error, StageTimeout)
+        if retryable and result.attempts <= stage.retries and status == 'success':
+            delay = stage.retry_delay * result.attempts
+            retry_at[name] = time.monotonic() + delay
+            self.log(f"[{name}] 第{result.attempts}次失败: {result.error}，{delay:.1f}秒后重试")
+            return status
+        result.status = 'failed'
+        if stage.optional:
+            self.log(f"[{name}] 失败，已跳过: {result.error}")
+            return status
+        self.log(f"[{name}] 失败: {result.error}")
+        return 'failed'
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+进程级共享对象
+config.yaml 只在文件修改后重新解析；OpenAI 客户端按 API Key 和地址复用，
+同一进程内的多次生成共用连接池（免去重复的TLS握手）
+"""
+
+import os
+import threading
+from typing import Any, Dict, Tuple
+
+import yaml
+
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def resolve_config_path(config_path: str = "config.yaml") -> str:
+    """相对路径先在当前目录查找，不存在时使用项目根目录下的文件"""
+    if os.path.exists(config_path) or os.path.isabs(config_path):
+        return config_path
+    return os.path.join(ROOT_DIR, config_path)
+
+
+class ConfigRegistry:
+    """
+    配置文件缓存
+
+    每次读取只检查文件的修改时间和大小，变化时重新解析（修改 config.yaml 无需重启）。
+    返回的字典在调用方之间共享，只读不改。
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self.load_count = 0
+
+    def get(self, config_path: str = "config.yaml") -> Dict[str, Any]:
+        """读取配置，文件不存在时返回空字典"""
+        path = os.path.abspath(resolve_config_path(config_path))
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return {}
+        signature = (stat.st_mtime_ns, stat.st_size)
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != signature:
+                with open(path, 'r', encoding='utf-8') as f:
+                    config = yaml.safe_load(f) or {}
+                entry = (signature, config)
+                self._entries[path] = entry
+                self.load_count += 1
+        return entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class LLMClientRegistry:
+    """OpenAI 客户端（按 API Key 和接口地址各一个，线程安全，可并发请求）"""
+
+    def __init__(self):
+        self._clients: Dict[Tuple[str, str], Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, api_key: str, base_url: str):
+        key = (api_key, base_url)
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                try:
+                    from openai import OpenAI
+                except ImportError:
+                    raise ImportError("openai库未安装")
+                client = OpenAI(api_key=api_key, base_url=base_url)
+                self._clients[key] = client
+        return client
+
+    def close(self):
+        """关闭全部客户端（进程退出或测试时）"""
+        with self._lock:
+            clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            client.close()
+
+
+# 单例模式
+config_registry = ConfigRegistry()
+llm_clients = LLMClientRegistry()
+
+
+def get_config(config_path: str = "config.yaml") -> Dict[str, Any]:
+    """当前配置（文件修改后自动重新读取）"""
+    return config_registry.get(config_path)
+
+
+def get_llm_client(api_key: str, base_url: str):
+    """共享的 OpenAI 客户端"""
+    return llm_clients.get(api_key, base_url)
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+研报目录索引
+SQLite 记录每份研报的日期、文件路径、数据格式版本、主要指数涨跌和文件大小，
+保存研报时更新；查看页面用一次索引查询列出和选择研报，不再逐个扫描目录
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+try:
+    from .market_schema import detect_version, migrate, loads
+except ImportError:
+    from market_schema import detect_version, migrate, loads
+
+
+# 放在单独的子目录中：SQLite 日志文件的创建/删除不会改变研报目录的mtime
+CATALOG_FILE = os.path.join(".catalog", "reports.sqlite")
+
+# 表结构或字段含义变化时递增，打开旧索引时整体重建
+CATALOG_VERSION = 2
+
+# 数据文件名，按优先级
+DATA_FILES = ("data_{date}.json", "data.json")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    date TEXT PRIMARY KEY,
+    folder TEXT NOT NULL,
+    report_path TEXT NOT NULL,
+    data_path TEXT,
+    data_schema INTEGER,
+    report_size INTEGER,
+    data_size INTEGER,
+    report_mtime REAL,
+    data_mtime REAL,
+    sh_change_pct REAL,
+    sz_change_pct REAL,
+    cy_change_pct REAL,
+    update_time TEXT,
+    indexed_at TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+COLUMNS = ('date', 'folder', 'report_path', 'data_path', 'data_schema', 'report_size', 'data_size',
+           'report_mtime', 'data_mtime', 'sh_change_pct', 'sz_change_pct', 'cy_change_pct',
+           'update_time', 'indexed_at')
+
+
+class ReportCatalog:
+    """研报目录（数据库文件位于研报目录下）"""
+
+    def __init__(self, report_dir: str = "./reports", db_path: Optional[str] = None):
+        self.report_dir = report_dir
+        self.db_path = db_path or os.path.join(report_dir, CATALOG_FILE)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.executescript(SCHEMA)
+            if conn.execute("PRAGMA user_version").fetchone()[0] != CATALOG_VERSION:
+                with conn:
+                    conn.execute("DELETE FROM reports")
+                    conn.execute("DELETE FROM meta")
+                conn.execute(f"PRAGMA user_version = {CATALOG_VERSION}")
+            self._conn = conn
+        return self._conn
+
+    # ==================== 写入 ====================
+
+    def index_report(self, folder: str) -> Optional[Dict[str, Any]]:
+        """索引一个日期目录（保存研报后调用），目录下没有 report.md 时删除记录"""
+        date = os.path.basename(os.path.normpath(folder))
+        report_path = os.path.join(folder, 'report.md')
+        with self._lock:
+            conn = self._connect()
+            if not os.path.exists(report_path):
+                with conn:
+                    conn.execute("DELETE FROM reports WHERE date = ?", (date,))
+                return None
+
+            data_path, data = self._data_path(folder), {}
+            if data_path:
+                try:
+                    with open(data_path, 'rb') as f:
+                        data = loads(f.read())
+                except (OSError, ValueError):
+                    data = {}
+
+            snapshot = migrate(data)
+            a_share = snapshot.a_share
+            report_stat = os.stat(report_path)
+            data_stat = os.stat(data_path) if data_path else None
+            row = {
+                'date': date,
+                'folder': folder,
+                'report_path': report_path,
+                'data_path': data_path,
+                'data_schema': detect_version(data),
+                'report_size': report_stat.st_size,
+                'data_size': data_stat.st_size if data_stat else None,
+                'report_mtime': report_stat.st_mtime,
+                'data_mtime': data_stat.st_mtime if data_stat else None,
+                'sh_change_pct': a_share['上证指数'].change_pct if '上证指数' in a_share else None,
+                'sz_change_pct': a_share['深证成指'].change_pct if '深证成指' in a_share else None,
+                'cy_change_pct': a_share['创业板指'].change_pct if '创业板指' in a_share else None,
+                'update_time': snapshot.update_time,
+                'indexed_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            }
+            with conn:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO reports ({', '.join(COLUMNS)}) "
+                    f"VALUES ({', '.join('?' for _ in COLUMNS)})",
+                    [row[c] for c in COLUMNS]
+                )
+            return row
+
+    def sync(self) -> int:
+        """扫描研报目录，补充新增目录、删除已不存在的记录，返回索引的目录数"""
+        with self._lock:
+            conn = self._connect()
+            folders = self._folders()
+            known = {row['date']: row for row in conn.execute(
+                "SELECT date, data_path, report_mtime, data_mtime FROM reports")}
+
+            count = 0
+            for date, folder in folders.items():
+                row = known.get(date)
+                if row is not None and self._unchanged(folder, row):
+                    continue
+                if self.index_report(folder) is not None:
+                    count += 1
+            with conn:
+                conn.executemany("DELETE FROM reports WHERE date = ?",
+                                 [(date,) for date in known if date not in folders])
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('dir_mtime', ?)",
+                             (str(self._mtime(self.report_dir)),))
+            return count
+
+    def _folders(self) -> Dict[str, str]:
+        """日期目录 {日期: 路径}"""
+        folders = {}
+        if os.path.isdir(self.report_dir):
+            for entry in os.scandir(self.report_dir):
+                if entry.is_dir() and not entry.name.startswith('.'):
+                    folders[entry.name] = entry.path
+        return folders
+
+    @staticmethod
+    def _data_path(folder: str) -> Optional[str]:
+        date = os.path.basename(os.path.normpath(folder))
+        for pattern in DATA_FILES:
+            candidate = os.path.join(folder, pattern.format(date=date))
+            if os.path.exists(candidate):
+                return candidate
+        return None
+
+    @staticmethod
+    def _mtime(path: str) -> Optional[float]:
+        try:
+            return os.stat(path).st_mtime
+        except OSError:
+            return None
+
+    def _unchanged(self, folder: str, row: sqlite3.Row) -> bool:
+        """研报和数据文件（路径和mtime）均与索引记录一致"""
+        report_mtime = self._mtime(os.path.join(folder, 'report.md'))
+        if report_mtime is None or report_mtime != row['report_mtime']:
+            return False
+        data_path = self._data_path(folder)
+        if data_path != row['data_path']:
+            return False
+        return data_path is None or self._mtime(data_path) == row['data_mtime']
+
+    def _ensure_synced(self):
+        """
+        研报目录有新增或删除的子目录时（目录mtime变化）重新同步
+
+        保存研报时已更新对应记录；手动修改已有目录中的文件后调用 sync()
+        """
+        with self._lock:
+            row = self._connect().execute("SELECT value FROM meta WHERE key = 'dir_mtime'").fetchone()
+            if row is None or row['value'] != str(self._mtime(self.report_dir)):
+                self.sync()
+
+    # ==================== 查询 ====================
+
+    def list_reports(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """按日期倒序列出研报"""
+        self._ensure_synced()
+        sql = "SELECT * FROM reports ORDER BY date DESC"
+        params: tuple = ()
+        if limit:
+            sql += " LIMIT ?"
+            params = (limit,)
+        with self._lock:
+            return [self._to_info(row) for row in self._connect().execute(sql, params)]
+
+    def get(self, date: str) -> Optional[Dict[str, Any]]:
+        """按日期获取研报"""
+        self._ensure_synced()
+        with self._lock:
+            row = self._connect().execute("SELECT * FROM reports WHERE date = ?", (date,)).fetchone()
+        return self._to_info(row) if row else None
+
+    @staticmethod
+    def _to_info(row: sqlite3.Row) -> Dict[str, Any]:
+        info = dict(row)
+        # 与旧的目录扫描结果保持相同的键
+        info['path'] = info['report_path']
+        return info
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_catalogs: Dict[str, ReportCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(report_dir: str = "./reports") -> ReportCatalog:
+    """按研报目录共享目录索引实例"""
+    key = os.path.abspath(report_dir)
+    with _catalogs_lock:
+        if key not in _catalogs:
+            _catalogs[key] = ReportCatalog(report_dir)
+        return _catalogs[key]
@@ -6,15 +6,42 @@
 
 import os
 import sys
-import json
-import yaml
+import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Generator
+from typing import Callable, Dict, List, Any, Optional, Generator, Tuple
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-
-def get_api_key():
+try:
+    from .sina_quote import sina_client
+    from .fixtures import market_provider
+    from .llm_cache import LLMResponseCache
+    from .stream_metrics import StreamMetrics, MetricsWriter
+    from .report_catalog import get_catalog
+    from .market_schema import SCHEMA_VERSION, save_snapshot
+    from .lazy import lazy_import
+    from .pipeline import is_empty_output
+    from .registry import get_config, get_llm_client
+except ImportError:
+    from sina_quote import sina_client
+    from fixtures import market_provider
+    from llm_cache import LLMResponseCache
+    from stream_metrics import StreamMetrics, MetricsWriter
+    from report_catalog import get_catalog
+    from market_schema import SCHEMA_VERSION, save_snapshot
+    from lazy import lazy_import
+    from pipeline import is_empty_output
+    from registry import get_config, get_llm_client
+
+# 依赖 pandas/pyarrow，首次计算指标或读写历史仓库时才导入
+technical_analysis = lazy_import('technical_analysis', __package__)
+warehouse = lazy_import('history_warehouse', __package__)
+
+
+def get_api_key(config_path: str = "config.yaml"):
     """获取API Key"""
     # 环境变量
     env_key = os.getenv("SILICONFLOW_API_KEY")
@@ -22,14 +49,10 @@ def get_api_key():
         return env_key
     
     # 配置文件
-    config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'config.yaml')
-    if os.path.exists(config_path):
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
-        openai_config = config.get('openai', {})
-        api_key = openai_config.get('api_key')
-        if api_key and api_key != 'your-api-key-here':
-            return api_key
+    openai_config = get_config(config_path).get('openai', {})
+    api_key = openai_config.get('api_key')
+    if api_key and api_key != 'your-api-key-here':
+        return api_key
     
     return None
 
@@ -39,43 +62,83 @@ class ReportGenerator:
     
     DEFAULT_MODEL = "moonshotai/Kimi-K2-Thinking"
     DEFAULT_BASE_URL = "https://api.siliconflow.cn/v1"
+    STAGE_TIMEOUT = 20   # 单个数据阶段超时（秒）
+    FETCH_DEADLINE = 45  # 全部数据获取总时限（秒）
+    MAX_TOKENS = 4000
+    SECTION_MAX_TOKENS = 1000  # 按章节生成时每个章节的上限
+    SYSTEM_PROMPT = "你是一位资深券商分析师。"
+    
+    # 报告章节: (标题, 写作要点, 所需数据分区)
+    REPORT_SECTIONS = [
+        ('A股大盘分析', '', ['a_share', 'sectors']),
+        ('美股市场分析', '', ['us_stock']),
+        ('行业板块分析', '', ['sectors']),
+        ('红利低波50指数分析', '关注其走势和成分股表现', ['dividend_index']),
+        ('AI板块分析', '', ['a_share', 'us_stock', 'sectors']),
+        ('黄金分析', 'AU9999和XAU', ['gold', 'us_stock']),
+        ('资金流向分析', '', ['a_share', 'sectors']),
+        ('风险提示', '', ['a_share', 'us_stock', 'sectors', 'dividend_index', 'gold']),
+        ('配置建议', '', ['a_share', 'us_stock', 'sectors', 'dividend_index', 'gold'])
+    ]
+    
+    # 新浪行情代码 -> (数据分区, 名称)
+    SINA_SYMBOLS = {
+        'int_nasdaq': ('us_stock', '纳斯达克'),
+        'int_sp500': ('us_stock', '标普500'),
+        'int_dji': ('us_stock', '道琼斯'),
+        'au0': ('gold', 'AU9999'),      # 上海黄金交易所
+        'hf_GC': ('gold', 'XAU')        # 国际现货黄金
+    }
+    
+    # 计算技术信号的指数: 名称 -> 新浪日线代码
+    INDICATOR_INDICES = {
+        '上证指数': 'sh000001',
+        '深证成指': 'sz399001',
+        '创业板指': 'sz399006'
+    }
+    
+    # 流式输出中的错误标记
+    ERROR_MARKER = "[错误: "
     
     def __init__(self, config_path: str = "config.yaml"):
         self.current_dir = os.path.dirname(os.path.abspath(__file__))
-        if not os.path.exists(config_path):
-            config_path = os.path.join(self.current_dir, '..', config_path)
-        
-        with open(config_path, 'r', encoding='utf-8') as f:
-            self.config = yaml.safe_load(f)
+        # 进程内共享，config.yaml 修改后自动重新读取（只读，不要修改）
+        self.config = get_config(config_path)
         
         # 获取API Key
-        self.api_key = get_api_key()
+        self.api_key = get_api_key(config_path)
         if not self.api_key:
             raise ValueError("未找到有效的API Key。请设置 SILICONFLOW_API_KEY 环境变量或在config.yaml中配置。")
         
-        # 初始化OpenAI客户端
-        try:
-            from openai import OpenAI
-            openai_config = self.config.get('openai', {})
-            base_url = openai_config.get('base_url', self.DEFAULT_BASE_URL)
-            self.model = openai_config.get('model', self.DEFAULT_MODEL)
-            
-            self.client = OpenAI(
-                api_key=self.api_key,
-                base_url=base_url
-            )
-        except ImportError:
-            raise ImportError("openai库未安装")
+        # OpenAI客户端（按API Key和地址复用，共用连接池）
+        openai_config = self.config.get('openai', {})
+        # LLM_BASE_URL 可指向本地模拟服务 (src/mock_llm_server.py)
+        self.base_url = os.getenv("LLM_BASE_URL") or openai_config.get('base_url', self.DEFAULT_BASE_URL)
+        self.model = openai_config.get('model', self.DEFAULT_MODEL)
+        self.temperature = openai_config.get('temperature', 0.7)
+        self.client = get_llm_client(self.api_key, self.base_url)
         
-        self.date_str = datetime.now().strftime('%Y-%m-%d')
-        self.output_dir = f"reports/{self.date_str}"
-        os.makedirs(self.output_dir, exist_ok=True)
-
-    def fetch_all_data(self) -> Dict[str, Any]:
-        """获取全市场数据"""
-        print("正在获取数据...")
+        # AI分析缓存
+        cache_config = self.config.get('llm_cache', {})
+        self.llm_cache = LLMResponseCache(
+            cache_dir=cache_config.get('dir', 'data/llm_cache'),
+            ttl_hours=cache_config.get('ttl_hours', 24),
+            enabled=cache_config.get('enabled', True)
+        )
+        
+        # 流式延迟统计
+        self.metrics_config = self.config.get('llm_metrics', {})
+        self.metrics_writer = MetricsWriter(self.metrics_config.get('dir', 'logs/llm_metrics'))
         
-        data = {
+        self.date_str = datetime.now().strftime('%Y-%m-%d')
+        self.output_dir = f"reports/{self.date_str}"  # 保存时创建
+        # 当前线程执行的获取阶段是否已被放弃（超时后不再输出日志）
+        self._fetch_state = threading.local()
+
+    def empty_data(self) -> Dict[str, Any]:
+        """数据结构（各分区为空）"""
+        return {
+            "schema_version": SCHEMA_VERSION,
             "date": self.date_str,
             "update_time": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
             "a_share": {},
@@ -84,126 +147,211 @@ class ReportGenerator:
             "dividend_index": {},  # 红利低波50
             "gold": {}  # AU9999和XAU
         }
+
+    def fetch_stages(self) -> Dict[str, Callable[[], Dict[str, Any]]]:
+        """数据获取阶段，每个阶段返回其负责的数据分区"""
+        return {
+            'a_share': self._fetch_a_share,
+            'quotes': self._fetch_quotes,  # 美股指数 + 黄金
+            'sectors': self._fetch_sectors,
+            'dividend_index': self._fetch_dividend_index
+        }
+
+    def fetch_all_data(self, save: bool = True) -> Dict[str, Any]:
+        """
+        获取全市场数据（各数据阶段并发执行）
+
+        Args:
+            save: 是否写入当天的数据文件（Web页面的后台刷新不写入，以定时任务的数据为准）
+
+        各阶段的超时和失败记录在返回值的 fetch_errors 中（{阶段: 原因}，不写入数据文件）。
+        """
+        print("正在获取数据...")
+        
+        data = self.empty_data()
+        errors: Dict[str, str] = {}
+        
+        stages = self.fetch_stages()
+        fetch_config = self.config.get('fetch', {})
+        stage_timeout = fetch_config.get('stage_timeout', self.STAGE_TIMEOUT)
+        deadline = fetch_config.get('deadline', self.FETCH_DEADLINE)
         
-        # 1. A股主要指数
-        print("  - 获取A股指数...")
+        start = time.monotonic()
+        # 各阶段同时开始，等待截止时间均从开始时刻计算
+        limit = min(stage_timeout, deadline)
+        deadline_at = start + limit
+        muted = {key: threading.Event() for key in stages}
+        executor = ThreadPoolExecutor(max_workers=len(stages), thread_name_prefix='fetch')
         try:
-            import akshare as ak
+            futures = {key: executor.submit(self._run_fetch_stage, func, muted[key])
+                       for key, func in stages.items()}
+            for key, future in futures.items():
+                try:
+                    result = future.result(timeout=max(0, deadline_at - time.monotonic()))
+                except FutureTimeoutError:
+                    muted[key].set()
+                    errors[key] = f"超时（{limit}秒）"
+                except Exception as e:
+                    errors[key] = f"{type(e).__name__}: {e}"
+                else:
+                    if is_empty_output(result):
+                        errors[key] = "无数据"
+                    data.update(result)
+        finally:
+            # 超时的阶段不再等待
+            executor.shutdown(wait=False, cancel_futures=True)
+        for key, reason in errors.items():
+            print(f"  - {key} 未获取: {reason}")
+        print(f"   数据获取耗时: {time.monotonic() - start:.1f}秒")
+        data['fetch_errors'] = errors
+        
+        self.attach_history(data)
+        if save:
+            self.save_data(data)
+        return data
+
+    def save_data(self, data: Dict[str, Any]) -> str:
+        """保存市场数据"""
+        data_path = f"{self.output_dir}/data_{self.date_str}.json"
+        save_snapshot(data_path, data)
+        print(f"   数据已保存: {data_path}")
+        # 增量更新历史行情仓库
+        try:
+            warehouse.history_warehouse.ingest(data, os.stat(data_path).st_mtime)
+        except Exception as e:
+            print(f"更新历史仓库失败: {e}")
+        return data_path
+
+    def attach_history(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """按 report.history_days 配置附加近几日走势（用于提示词）"""
+        days = self.config.get('report', {}).get('history_days', 0)
+        if days:
+            try:
+                history = warehouse.history_warehouse.context_text(self.date_str, days)
+                if history:
+                    data['history'] = history
+            except Exception as e:
+                print(f"读取历史走势失败: {e}")
+        return data
+
+    def _run_fetch_stage(self, func: Callable[[], Dict[str, Any]], muted: threading.Event) -> Dict[str, Any]:
+        self._fetch_state.muted = muted
+        try:
+            return func()
+        finally:
+            self._fetch_state.muted = None
+
+    def _log(self, message: str):
+        """获取阶段的日志；阶段超时被放弃后不再输出，避免混入后续内容"""
+        muted = getattr(self._fetch_state, 'muted', None)
+        if muted is None or not muted.is_set():
+            print(message)
+
+    def _fetch_a_share(self) -> Dict[str, Any]:
+        """A股主要指数"""
+        self._log("  - 获取A股指数...")
+        result = {}
+        try:
+            ak = market_provider('akshare')
             df_index = ak.stock_zh_index_spot_sina()
             for idx_name in ['上证指数', '深证成指', '创业板指']:
                 row = df_index[df_index['名称'] == idx_name].iloc[0]
-                data['a_share'][idx_name] = {
+                result[idx_name] = {
                     'price': float(row['最新价']),
                     'change': float(row['涨跌额']),
                     'change_pct': float(row['涨跌幅']),
                     'volume': str(row['成交量']),
                     'amount': str(row['成交额'])
                 }
-                print(f"     {idx_name}: {row['最新价']:.2f} ({row['涨跌幅']:+.2f}%)")
+                self._log(f"     {idx_name}: {row['最新价']:.2f} ({row['涨跌幅']:+.2f}%)")
         except Exception as e:
-            print(f"     失败: {e}")
-        
-        # 2. 美股指数
-        print("  - 获取美股指数...")
-        try:
-            import requests
-            headers = {'Referer': 'https://finance.sina.com.cn'}
-            us_symbols = [
-                ('int_nasdaq', '纳斯达克'),
-                ('int_sp500', '标普500'),
-                ('int_dji', '道琼斯')
-            ]
-            for symbol, name in us_symbols:
-                url = f"https://hq.sinajs.cn/list={symbol}"
-                r = requests.get(url, headers=headers, timeout=10)
-                if r.status_code == 200 and 'hq_str' in r.text:
-                    content = r.text.split('"')[1]
-                    parts = content.split(',')
-                    if len(parts) >= 4:
-                        data['us_stock'][name] = {
-                            'price': float(parts[1]),
-                            'change': float(parts[2]),
-                            'change_pct': float(parts[3])
-                        }
-                        print(f"     {name}: {parts[1]} ({parts[3]}%)")
-        except Exception as e:
-            print(f"     失败: {e}")
-        
-        # 3. 板块数据
-        print("  - 获取板块数据...")
+            self._log(f"     A股指数失败: {e}")
+        return {'a_share': result}
+
+    def _fetch_sectors(self) -> Dict[str, Any]:
+        """行业板块"""
+        self._log("  - 获取板块数据...")
         try:
-            import akshare as ak
+            ak = market_provider('akshare')
             df = ak.stock_board_industry_name_em()
             top_gainers = df.nlargest(10, '涨跌幅')[['板块名称', '涨跌幅']]
             top_losers = df.nsmallest(10, '涨跌幅')[['板块名称', '涨跌幅']]
-            data['sectors'] = {
+            self._log(f"     获取到 {len(df)} 个板块")
+            return {'sectors': {
                 'top_gainers': top_gainers.to_dict('records'),
                 'top_losers': top_losers.to_dict('records')
-            }
-            print(f"     获取到 {len(df)} 个板块")
+            }}
         except Exception as e:
-            print(f"     失败: {e}")
-        
-        # 4. 红利低波50指数成分股
-        print("  - 获取红利低波50成分股...")
+            self._log(f"     板块数据失败: {e}")
+            return {}
+
+    def _fetch_dividend_index(self) -> Dict[str, Any]:
+        """红利低波50指数成分股"""
+        self._log("  - 获取红利低波50成分股...")
         try:
-            import akshare as ak
+            ak = market_provider('akshare')
             # 中证红利低波50指数 H30269
             df = ak.index_stock_cons_weight_csindex(symbol="H30269")
             # 只保留前20大权重
             top_weights = df.nlargest(20, '权重')[['成分券代码', '成分券名称', '权重']]
-            data['dividend_index'] = {
+            self._log(f"     获取到 {len(top_weights)} 只成分股")
+            return {'dividend_index': {
                 'name': '中证红利低波50 (H30269)',
                 'top_components': top_weights.to_dict('records')
-            }
-            print(f"     获取到 {len(top_weights)} 只成分股")
+            }}
         except Exception as e:
-            print(f"     失败: {e}")
-        
-        # 5. 黄金价格 (AU9999和XAU)
-        print("  - 获取黄金价格...")
+            self._log(f"     红利低波50失败: {e}")
+            return {}
+
+    def _fetch_quotes(self) -> Dict[str, Any]:
+        """美股指数和黄金价格（新浪行情，一次请求）"""
+        self._log("  - 获取美股指数和黄金价格...")
+        result = {'us_stock': {}, 'gold': {}}
         try:
-            import requests
-            headers = {'Referer': 'https://finance.sina.com.cn'}
-            
-            # AU9999 (上海黄金交易所)
-            url_au = "https://hq.sinajs.cn/list=au0"
-            r_au = requests.get(url_au, headers=headers, timeout=10)
-            if r_au.status_code == 200:
-                content = r_au.text.split('"')[1]
-                parts = content.split(',')
-                if len(parts) >= 3:
-                    data['gold']['AU9999'] = {
-                        'price': float(parts[2]),
-                        'name': 'AU9999'
+            quotes = sina_client.fetch(self.SINA_SYMBOLS.keys())
+            for symbol, (section, name) in self.SINA_SYMBOLS.items():
+                quote = quotes.get(symbol)
+                if quote is None or quote.price is None:
+                    continue
+                if section == 'us_stock':
+                    if quote.change is None or quote.change_pct is None:
+                        continue
+                    result['us_stock'][name] = {
+                        'price': quote.price,
+                        'change': quote.change,
+                        'change_pct': quote.change_pct
                     }
-                    print(f"     AU9999: {parts[2]}")
-            
-            # XAU (国际现货黄金)
-            url_xau = "https://hq.sinajs.cn/list=hf_GC"
-            r_xau = requests.get(url_xau, headers=headers, timeout=10)
-            if r_xau.status_code == 200:
-                content = r_xau.text.split('"')[1]
-                parts = content.split(',')
-                if len(parts) >= 3:
-                    data['gold']['XAU'] = {
-                        'price': float(parts[2]),
-                        'name': 'XAU/USD'
+                    self._log(f"     {name}: {quote.price} ({quote.change_pct}%)")
+                else:
+                    result['gold'][name] = {
+                        'price': quote.price,
+                        'name': 'XAU/USD' if name == 'XAU' else name
                     }
-                    print(f"     XAU: {parts[2]}")
+                    self._log(f"     {name}: {quote.price}")
         except Exception as e:
-            print(f"     失败: {e}")
-        
-        # 保存数据
-        data_path = f"{self.output_dir}/data_{self.date_str}.json"
-        with open(data_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        print(f"   数据已保存: {data_path}")
-        
-        return data
-
-    def build_prompt(self, data: Dict[str, Any]) -> str:
-        """构建提示词 - 只包含数据和框架，不引导AI"""
+            self._log(f"     新浪行情失败: {e}")
+        return result
+
+    def _fetch_indicators(self) -> Dict[str, Any]:
+        """主要指数技术信号（近一年日线）"""
+        self._log("  - 计算指数技术指标...")
+        result = {}
+        ak = market_provider('akshare')
+        TechnicalAnalyzer = technical_analysis.TechnicalAnalyzer
+        for name, symbol in self.INDICATOR_INDICES.items():
+            try:
+                df = ak.stock_zh_index_daily(symbol=symbol).tail(250).reset_index(drop=True)
+                df = TechnicalAnalyzer.calculate_all_indicators(df)
+                signals = TechnicalAnalyzer.get_latest_signals(df)
+                signals['TREND'] = TechnicalAnalyzer.calculate_trend_strength(df)
+                result[name] = signals
+                self._log(f"     {name}: {signals['TREND']}")
+            except Exception as e:
+                self._log(f"     {name} 技术指标失败: {e}")
+        return {'indicators': result}
+
+    def build_data_blocks(self, data: Dict[str, Any]) -> Dict[str, str]:
+        """按数据分区格式化提示词中的数据段落"""
         a_share = data.get('a_share', {})
         us_stock = data.get('us_stock', {})
         sectors = data.get('sectors', {})
@@ -223,28 +371,55 @@ class ReportGenerator:
         
         dividend_components = dividend.get('top_components', [])
         
-        prompt = f"""今日市场数据：
-
-A股指数：
+        a_share_text = f"""A股指数：
 上证指数: {sh.get('price', 0):.2f} ({sh.get('change_pct', 0):+.2f}%)
 深证成指: {sz.get('price', 0):.2f} ({sz.get('change_pct', 0):+.2f}%)
-创业板指: {cy.get('price', 0):.2f} ({cy.get('change_pct', 0):+.2f}%)
-
-美股指数：
+创业板指: {cy.get('price', 0):.2f} ({cy.get('change_pct', 0):+.2f}%)"""
+        
+        # 技术信号（仅在计算了技术指标时附加）
+        indicators = data.get('indicators', {})
+        if indicators:
+            a_share_text += "\n技术信号：\n" + "\n".join(
+                f"{name}: {sig.get('TREND', '-')}，均线{sig.get('MA_TREND', '-')}，MACD{sig.get('MACD', '-')}，"
+                f"RSI {sig.get('RSI_VALUE', '-')}（{sig.get('RSI', '-')}），布林{sig.get('BOLLINGER', '-')}"
+                for name, sig in indicators.items()
+            )
+        
+        # 近几日走势（仅在配置了 report.history_days 时附加）
+        if data.get('history'):
+            a_share_text += "\n" + data['history']
+        
+        return {
+            'a_share': a_share_text,
+            'us_stock': f"""美股指数：
 道琼斯: {dow.get('price', 0):,.2f} ({dow.get('change_pct', 0):+.2f}%)
 标普500: {sp500.get('price', 0):,.2f} ({sp500.get('change_pct', 0):+.2f}%)
-纳斯达克: {nasdaq.get('price', 0):,.2f} ({nasdaq.get('change_pct', 0):+.2f}%)
-
-行业板块涨跌前5：
+纳斯达克: {nasdaq.get('price', 0):,.2f} ({nasdaq.get('change_pct', 0):+.2f}%)""",
+            'sectors': f"""行业板块涨跌前5：
 领涨: {', '.join([f"{g.get('板块名称', '-')}({g.get('涨跌幅', 0):+.2f}%)" for g in (gainers[:5] if gainers else [])])}
-领跌: {', '.join([f"{l.get('板块名称', '-')}({l.get('涨跌幅', 0):+.2f}%)" for l in (losers[:5] if losers else [])])}
+领跌: {', '.join([f"{l.get('板块名称', '-')}({l.get('涨跌幅', 0):+.2f}%)" for l in (losers[:5] if losers else [])])}""",
+            'dividend_index': f"""红利低波50指数成分股（前10大权重）：
+{chr(10).join([f"{c.get('成分券代码', '-')} {c.get('成分券名称', '-')} 权重{c.get('权重', 0):.2f}%" for c in (dividend_components[:10] if dividend_components else [])])}""",
+            'gold': f"""黄金：
+AU9999: {gold.get('AU9999', {}).get('price', '-')}元/克
+XAU: {gold.get('XAU', {}).get('price', '-')}美元/盎司"""
+        }
+
+    def build_prompt(self, data: Dict[str, Any]) -> str:
+        """构建提示词 - 只包含数据和框架，不引导AI"""
+        blocks = self.build_data_blocks(data)
+        
+        prompt = f"""今日市场数据：
 
-红利低波50指数成分股（前10大权重）：
-{chr(10).join([f"{c.get('成分券代码', '-')} {c.get('成分券名称', '-')} 权重{c.get('权重', 0):.2f}%" for c in (dividend_components[:10] if dividend_components else [])])}
+{blocks['a_share']}
 
-黄金：
-AU9999: {gold.get('AU9999', {}).get('price', '-')}元/克
-XAU: {gold.get('XAU', {}).get('price', '-')}美元/盎司
+{blocks['us_stock']}
+
+{blocks['sectors']}
+
+{blocks['dividend_index']}
+
+{blocks['gold']}
 
 请基于以上数据撰写每日市场观察报告，包含：
 1. A股大盘分析
@@ -261,59 +436,172 @@ XAU: {gold.get('XAU', {}).get('price', '-')}美元/盎司
         
         return prompt
 
-    def generate_ai_analysis_stream(self, data: Dict[str, Any]) -> Generator[str, None, None]:
-        """流式生成AI分析"""
-        prompt = self.build_prompt(data)
+    def build_section_prompt(self, data: Dict[str, Any], section: Tuple[str, str, List[str]]) -> str:
+        """构建单个章节的提示词，只包含该章节需要的数据"""
+        title, hint, keys = section
+        blocks = self.build_data_blocks(data)
+        data_text = "\n\n".join(blocks[key] for key in keys)
+        requirement = f"（{hint}）" if hint else ""
         
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "你是一位资深券商分析师。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=4000,
-                stream=True
-            )
-            
-            for chunk in response:
-                if chunk.choices[0].delta.content:
-                    yield chunk.choices[0].delta.content
-                    
-        except Exception as e:
-            yield f"\n\n[错误: {e}]"
+        return f"""今日市场数据：
 
-    def save_report(self, content: str) -> str:
-        """保存研报"""
-        filepath = f"{self.output_dir}/report.md"
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
-        return filepath
+{data_text}
 
+请基于以上数据撰写每日市场观察报告中的「{title}」部分{requirement}，只写这一部分，不要输出章节标题。
 
-def main():
-    """主函数"""
-    print("="*60)
-    print(f"每日研报生成 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print("="*60)
-    
-    try:
-        generator = ReportGenerator()
-        data = generator.fetch_all_data()
+要求：基于数据给出观点，不要泛泛而谈。"""
+
+    def generate_ai_analysis_stream(self, data: Dict[str, Any], use_cache: bool = True,
+                                    parallel_sections: Optional[bool] = None,
+                                    prompt: Optional[str] = None) -> Generator[str, None, None]:
+        """
+        流式生成AI分析
         
-        print("\n生成AI分析（流式输出）...")
-        print("-"*60)
+        Args:
+            data: 市场数据
+            use_cache: 是否读取缓存；为False时强制重新生成（结果仍会写入缓存）
+            parallel_sections: 是否按章节并发生成，默认读取 openai.parallel_sections 配置
+            prompt: 已构建的提示词，默认由 build_prompt 生成（按章节生成时不使用）
+        """
+        if parallel_sections is None:
+            parallel_sections = self.config.get('openai', {}).get('parallel_sections', False)
+        if parallel_sections:
+            yield from self.generate_sections_stream(data, use_cache=use_cache)
+            return
         
-        ai_content = ""
-        for chunk in generator.generate_ai_analysis_stream(data):
-            print(chunk, end='', flush=True)
-            ai_content += chunk
+        messages = [
+            {"role": "system", "content": self.SYSTEM_PROMPT},
+            {"role": "user", "content": prompt if prompt is not None else self.build_prompt(data)}
+        ]
+        yield from self._stream_completion(messages, self.MAX_TOKENS, use_cache=use_cache, label="full")
+
+    def generate_sections_stream(self, data: Dict[str, Any],
+                                 use_cache: bool = True) -> Generator[str, None, None]:
+        """
+        按章节并发生成AI分析，按原章节顺序合并输出
         
-        print("\n" + "-"*60)
+        每个章节单独请求，各章节同时生成；当前排在最前的章节实时流式输出，
+        后续章节的内容先缓冲，轮到时立即输出。
+        """
+        openai_config = self.config.get('openai', {})
+        max_tokens = openai_config.get('section_max_tokens', self.SECTION_MAX_TOKENS)
+        max_workers = openai_config.get('section_workers', len(self.REPORT_SECTIONS))
         
-        # 构建完整报告
-        report = f"""# {generator.date_str} 每日市场观察
+        stop = threading.Event()
+        queues = [queue.Queue() for _ in self.REPORT_SECTIONS]
+        
+        def worker(section, out: queue.Queue):
+            try:
+                messages = [
+                    {"role": "system", "content": self.SYSTEM_PROMPT},
+                    {"role": "user", "content": self.build_section_prompt(data, section)}
+                ]
+                for chunk in self._stream_completion(messages, max_tokens, use_cache=use_cache,
+                                                     label=section[0]):
+                    if stop.is_set():
+                        break
+                    out.put(chunk)
+            except Exception as e:
+                # 与流式接口的错误一致：写入错误标记，调用方可以识别
+                out.put(f"\n\n{self.ERROR_MARKER}{e}]")
+            finally:
+                out.put(None)
+        
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='section')
+        try:
+            for section, out in zip(self.REPORT_SECTIONS, queues):
+                executor.submit(worker, section, out)
+            
+            for i, (section, out) in enumerate(zip(self.REPORT_SECTIONS, queues), 1):
+                yield f"### {i}. {section[0]}\n\n"
+                while True:
+                    chunk = out.get()
+                    if chunk is None:
+                        break
+                    yield chunk
+                yield "\n\n"
+        finally:
+            # 调用方提前停止时，通知其余章节放弃生成
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _stream_completion(self, messages: List[Dict[str, str]], max_tokens: int,
+                           use_cache: bool = True, label: str = "full") -> Generator[str, None, None]:
+        """调用模型并流式返回内容，命中缓存时回放；延迟统计写入 logs/llm_metrics"""
+        # 接口地址参与寻址：指向模拟服务时的输出不会被当作真实模型的结果复用
+        cache_key = self.llm_cache.make_key(self.model, self.temperature, messages, max_tokens=max_tokens,
+                                            base_url=self.base_url)
+        metrics = StreamMetrics(
+            label,
+            stall_seconds=self.metrics_config.get('stall_seconds', 5),
+            model=self.model,
+            max_tokens=max_tokens,
+            prompt_chars=sum(len(m['content']) for m in messages)
+        )
+        error = None
+        completed = False
+        response = None
+        
+        try:
+            if use_cache:
+                cached_chunks = self.llm_cache.get(cache_key)
+                if cached_chunks is not None:
+                    metrics.meta['source'] = 'cache'
+                    for chunk in cached_chunks:
+                        metrics.on_chunk(chunk)
+                        yield chunk
+                    completed = True
+                    return
+            
+            metrics.meta['source'] = 'api'
+            chunks = []
+            finish_reason = None
+            try:
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=self.temperature,
+                    max_tokens=max_tokens,
+                    stream=True
+                )
+                
+                for chunk in response:
+                    if not chunk.choices:
+                        continue
+                    choice = chunk.choices[0]
+                    if choice.finish_reason:
+                        finish_reason = choice.finish_reason
+                    if choice.delta.content:
+                        content = choice.delta.content
+                        metrics.on_chunk(content)
+                        chunks.append(content)
+                        yield content
+                
+                metrics.meta['finish_reason'] = finish_reason
+                if finish_reason != 'stop':
+                    # 连接中途断开（没有结束标记）或达到长度上限：内容不完整
+                    raise RuntimeError(f"输出不完整（finish_reason={finish_reason}）")
+                        
+            except Exception as e:
+                error = e
+                completed = True
+                yield f"\n\n{self.ERROR_MARKER}{e}]"
+                return
+            
+            # 只缓存正常结束（finish_reason=stop）的结果
+            self.llm_cache.put(cache_key, chunks, model=self.model)
+            completed = True
+        finally:
+            if response is not None and not completed:
+                # 调用方提前停止：关闭连接，服务端随之停止生成
+                response.close()
+            record = metrics.finish(error)
+            record['cancelled'] = not completed
+            self.metrics_writer.write(self.date_str, record)
+
+    def render_report(self, data: Dict[str, Any], ai_content: str) -> str:
+        """渲染完整研报Markdown"""
+        report = f"""# {self.date_str} 每日市场观察
 
 **数据时间：{data.get('update_time', datetime.now().strftime('%Y-%m-%d %H:%M:%S'))}**
 
@@ -353,6 +641,45 @@ def main():
 
 *生成时间：{datetime.now().strftime('%H:%M:%S')}*
 """
+        return report
+
+    def save_report(self, content: str) -> str:
+        """保存研报"""
+        filepath = f"{self.output_dir}/report.md"
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(content)
+        # 更新研报目录索引
+        try:
+            get_catalog(os.path.dirname(self.output_dir)).index_report(self.output_dir)
+        except Exception as e:
+            print(f"更新研报索引失败: {e}")
+        return filepath
+
+
+def main():
+    """主函数"""
+    print("="*60)
+    print(f"每日研报生成 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("="*60)
+    
+    try:
+        generator = ReportGenerator()
+        data = generator.fetch_all_data()
+        
+        print("\n生成AI分析（流式输出）...")
+        print("-"*60)
+        
+        ai_chunks = []
+        for chunk in generator.generate_ai_analysis_stream(data):
+            print(chunk, end='', flush=True)
+            ai_chunks.append(chunk)
+        ai_content = "".join(ai_chunks)
+        
+        print("\n" + "-"*60)
+        
+        # 构建完整报告
+        report = generator.render_report(data, ai_content)
         
         filepath = generator.save_report(report)
         
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+研报读取模块
+通过目录索引（report_catalog.py）列出 reports/ 下的历史研报，加载并解析报告内容和数据；
+解析结果按文件修改时间缓存，已查看过的研报不再重复读取
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from .cache import TTLCache
+    from .report_catalog import get_catalog, DATA_FILES
+    from .market_schema import MarketSnapshot, load_snapshot
+except ImportError:
+    from cache import TTLCache
+    from report_catalog import get_catalog, DATA_FILES
+    from market_schema import MarketSnapshot, load_snapshot
+
+
+AI_SECTION = "AI分析"
+
+
+@dataclass
+class ReportSection:
+    """二级标题（## ）下的一节"""
+    title: str
+    body: str
+
+
+@dataclass
+class ParsedReport:
+    """解析后的研报"""
+    date: str
+    content: str
+    data: MarketSnapshot
+    title: str = ""
+    sections: List[ReportSection] = field(default_factory=list)
+
+    def section(self, title: str) -> Optional[str]:
+        """按标题取一节的正文"""
+        for s in self.sections:
+            if s.title == title:
+                return s.body
+        return None
+
+    @property
+    def ai_content(self) -> str:
+        """AI分析一节（标题可带后缀，如「AI分析（基于模板）」）"""
+        for s in self.sections:
+            if s.title.startswith(AI_SECTION):
+                return s.body
+        return ""
+
+
+def parse_sections(content: str) -> Tuple[str, List[ReportSection]]:
+    """
+    按二级标题拆分研报，返回 (一级标题, 各节)
+
+    一节在下一个二级标题或单独一行的 --- 处结束（表格的 |---| 不算）。
+    """
+    title = ""
+    sections: List[ReportSection] = []
+    current: Optional[Tuple[str, List[str]]] = None
+
+    def close():
+        if current is not None:
+            sections.append(ReportSection(current[0], "\n".join(current[1]).strip()))
+
+    for line in content.splitlines():
+        if line.startswith("# ") and not title:
+            title = line[2:].strip()
+        elif line.startswith("## "):
+            close()
+            current = (line[3:].strip(), [])
+        elif line.strip() == "---":
+            close()
+            current = None
+        elif current is not None:
+            current[1].append(line)
+    close()
+    return title, sections
+
+
+# 解析结果缓存，键包含文件修改时间，文件变化后自动失效
+_report_cache = TTLCache(max_bytes=64 * 1024 * 1024, default_ttl=7 * 86400)
+
+
+def get_available_reports(report_dir: str = './reports') -> List[Dict[str, Any]]:
+    """获取所有可用的研报（按日期倒序）"""
+    return get_catalog(report_dir).list_reports()
+
+
+def _data_path(report_info: Dict[str, Any]) -> Optional[str]:
+    if 'data_path' in report_info:
+        return report_info['data_path']
+    for name in DATA_FILES:
+        path = os.path.join(report_info['folder'], name.format(date=report_info['date']))
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _mtime(path: Optional[str]) -> Optional[float]:
+    try:
+        return os.stat(path).st_mtime if path else None
+    except OSError:
+        return None
+
+
+def load_report(report_info: Dict[str, Any]) -> ParsedReport:
+    """加载并解析研报（按文件修改时间缓存）"""
+    data_path = _data_path(report_info)
+    key = (report_info['path'], _mtime(report_info['path']), data_path, _mtime(data_path))
+    report = _report_cache.get(key)
+    if report is not None:
+        return report
+
+    with open(report_info['path'], 'r', encoding='utf-8') as f:
+        content = f.read()
+    if data_path and os.path.exists(data_path):
+        data = load_snapshot(data_path)
+    else:
+        data = MarketSnapshot(date=report_info['date'])
+    title, sections = parse_sections(content)
+
+    report = ParsedReport(date=report_info['date'], content=content, data=data,
+                          title=title, sections=sections)
+    _report_cache.set(key, report)
+    return report
+
+
+def load_report_data(report_info: Dict[str, Any]) -> Tuple[str, MarketSnapshot]:
+    """加载研报内容和数据（数据转换为当前版本的统一结构）"""
+    report = load_report(report_info)
+    return report.content, report.data
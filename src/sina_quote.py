@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+新浪财经行情客户端
+多个代码合并为一次 hq.sinajs.cn/list= 请求，复用长连接
+"""
+
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+try:
+    from .fixtures import fixture_store
+    from .lazy import lazy_import
+except ImportError:
+    from fixtures import fixture_store
+    from lazy import lazy_import
+
+# 首次请求时才导入
+requests = lazy_import('requests')
+
+
+SINA_HQ_URL = "https://hq.sinajs.cn/list="
+SINA_HEADERS = {'Referer': 'https://finance.sina.com.cn'}
+
+_HQ_LINE = re.compile(r'var hq_str_([\w.]+)="([^"]*)"')
+
+
+@dataclass
+class SinaQuote:
+    """单个代码的行情记录"""
+    symbol: str
+    name: str
+    price: Optional[float]
+    change: Optional[float] = None
+    change_pct: Optional[float] = None
+    fields: List[str] = field(default_factory=list)
+
+
+def _to_float(value: str) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _field(parts: List[str], index: Optional[int]) -> Optional[str]:
+    if index is None or index >= len(parts):
+        return None
+    return parts[index]
+
+
+def parse_quote(symbol: str, content: str) -> Optional[SinaQuote]:
+    """按代码类型解析一条行情字符串"""
+    parts = content.split(',')
+    if not content or len(parts) < 3:
+        return None
+
+    if symbol.startswith('int_'):
+        # 国际指数: 名称,最新价,涨跌额,涨跌幅
+        name_idx, price_idx, change_idx, pct_idx = 0, 1, 2, 3
+    elif symbol.startswith('hf_'):
+        # 外盘期货: 名称在最后一个字段
+        name_idx, price_idx, change_idx, pct_idx = len(parts) - 1, 2, None, None
+    elif symbol.startswith(('sh', 'sz', 'bj')):
+        # A股/指数: 名称,今开,昨收,最新价,...
+        price = _to_float(_field(parts, 3))
+        prev_close = _to_float(_field(parts, 2))
+        change = price - prev_close if price is not None and prev_close else None
+        return SinaQuote(
+            symbol=symbol,
+            name=parts[0],
+            price=price,
+            change=change,
+            change_pct=change / prev_close * 100 if change is not None else None,
+            fields=parts
+        )
+    else:
+        # 国内期货 (au0等): 名称,时间,价格,...
+        name_idx, price_idx, change_idx, pct_idx = 0, 2, None, None
+
+    return SinaQuote(
+        symbol=symbol,
+        name=_field(parts, name_idx) or symbol,
+        price=_to_float(_field(parts, price_idx)),
+        change=_to_float(_field(parts, change_idx)),
+        change_pct=_to_float(_field(parts, pct_idx)),
+        fields=parts
+    )
+
+
+def parse_hq_response(text: str) -> Dict[str, SinaQuote]:
+    """一次性解析响应中所有 var hq_str_*="..." 行"""
+    quotes = {}
+    for match in _HQ_LINE.finditer(text):
+        quote = parse_quote(match.group(1), match.group(2))
+        if quote is not None:
+            quotes[quote.symbol] = quote
+    return quotes
+
+
+class SinaQuoteClient:
+    """新浪行情客户端（连接池复用）"""
+
+    def __init__(self, timeout: float = 10, pool_size: int = 4):
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        """首次请求时创建连接池"""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    session.headers.update(SINA_HEADERS)
+                    adapter = requests.adapters.HTTPAdapter(pool_connections=self.pool_size,
+                                                            pool_maxsize=self.pool_size)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self._session = session
+        return self._session
+
+    def fetch(self, symbols: Iterable[str]) -> Dict[str, SinaQuote]:
+        """一次请求获取多个代码的行情"""
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+        text = fixture_store.call('sina.hq', self._request, (','.join(symbols),))
+        return parse_hq_response(text)
+
+    def _request(self, symbol_list: str) -> str:
+        r = self.session.get(SINA_HQ_URL + symbol_list, timeout=self.timeout)
+        r.raise_for_status()
+        r.encoding = 'gbk'
+        return r.text
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+# 单例模式
+sina_client = SinaQuoteClient()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+流式输出延迟统计
+记录首字延迟(TTFT)、分块间隔、输出速度和长时间停顿，按报告日期写入JSONL
+"""
+
+import os
+import json
+import time
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+class StreamMetrics:
+    """单次流式请求的延迟统计"""
+
+    def __init__(self, label: str = "", stall_seconds: float = 5.0, **meta: Any):
+        self.label = label
+        self.stall_seconds = stall_seconds
+        self.meta = meta
+        self.started_at = datetime.now()
+        self._start = time.perf_counter()
+        self._last: Optional[float] = None
+        self.first_chunk: Optional[float] = None
+        self.gaps: List[float] = []
+        self.stalls: List[Dict[str, float]] = []
+        self.chunks = 0
+        self.chars = 0
+
+    def on_chunk(self, text: str):
+        """每收到一个分块调用一次"""
+        now = time.perf_counter() - self._start
+        if self.first_chunk is None:
+            self.first_chunk = now
+        else:
+            gap = now - self._last
+            self.gaps.append(gap)
+            if gap >= self.stall_seconds:
+                self.stalls.append({'at': round(self._last, 3), 'seconds': round(gap, 3)})
+        self._last = now
+        self.chunks += 1
+        self.chars += len(text)
+
+    def finish(self, error: Optional[BaseException] = None) -> Dict[str, Any]:
+        """结束统计并返回结果"""
+        total = time.perf_counter() - self._start
+        # 流式接口每个分块通常对应一个token；速度按首个分块之后的生成阶段计算
+        generation = (self._last - self.first_chunk) if self.first_chunk is not None else 0
+        gaps = sorted(self.gaps)
+        return {
+            'label': self.label,
+            'started_at': self.started_at.strftime('%Y-%m-%d %H:%M:%S'),
+            **self.meta,
+            'ttft': round(self.first_chunk, 3) if self.first_chunk is not None else None,
+            'total_seconds': round(total, 3),
+            'chunks': self.chunks,
+            'chars': self.chars,
+            'tokens_per_sec': round((self.chunks - 1) / generation, 2) if self.chunks > 1 and generation > 0 else None,
+            'gap_mean': round(sum(gaps) / len(gaps), 4) if gaps else None,
+            'gap_p95': round(gaps[int(len(gaps) * 0.95)], 4) if gaps else None,
+            'gap_max': round(gaps[-1], 4) if gaps else None,
+            'stalls': self.stalls,
+            'error': f"{type(error).__name__}: {error}" if error else None
+        }
+
+
+class MetricsWriter:
+    """按日期追加写入统计记录（线程安全）"""
+
+    def __init__(self, log_dir: str = "logs/llm_metrics"):
+        self.log_dir = log_dir
+        self._lock = threading.Lock()
+
+    def path(self, date_str: str) -> str:
+        return os.path.join(self.log_dir, f"{date_str}.jsonl")
+
+    def write(self, date_str: str, record: Dict[str, Any]):
+        with self._lock:
+            os.makedirs(self.log_dir, exist_ok=True)
+            with open(self.path(date_str), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
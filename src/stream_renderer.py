@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+流式Markdown渲染
+缓冲分块并按时间/字数节流刷新；已完成的段落只渲染一次，只重绘仍在变化的最后一段
+"""
+
+import time
+from typing import Any, List
+
+
+class StreamRenderer:
+    """
+    节流的增量Markdown渲染器
+
+    container 需提供 empty()，其返回的占位符需提供 markdown()，
+    如 Streamlit 的 st.container()。
+    """
+
+    def __init__(self, container: Any, interval: float = 0.15, min_chars: int = 200):
+        self.container = container
+        self.interval = interval
+        self.min_chars = min_chars
+        self.chunks: List[str] = []
+        self._pending: List[str] = []
+        self._pending_chars = 0
+        self._tail = ""  # 仍在变化的最后一段
+        self._placeholder = container.empty()
+        self._last_flush = time.monotonic()
+
+    def write(self, chunk: str):
+        """追加一个分块，达到时间或字数阈值时刷新"""
+        self.chunks.append(chunk)
+        self._pending.append(chunk)
+        self._pending_chars += len(chunk)
+        if (self._pending_chars >= self.min_chars
+                or time.monotonic() - self._last_flush >= self.interval):
+            self.flush()
+
+    def flush(self):
+        """把缓冲内容渲染到页面"""
+        if not self._pending:
+            return
+        text = self._tail + "".join(self._pending)
+        self._pending.clear()
+        self._pending_chars = 0
+
+        cut = self._stable_cut(text)
+        if cut > 0:
+            # 已完成的段落定稿，之后的内容使用新的占位符
+            self._placeholder.markdown(text[:cut])
+            self._placeholder = self.container.empty()
+            text = text[cut:].lstrip("\n")
+        self._tail = text
+        if text:
+            self._placeholder.markdown(text)
+        self._last_flush = time.monotonic()
+
+    def close(self) -> str:
+        """刷新剩余内容并返回完整文本"""
+        self.flush()
+        return "".join(self.chunks)
+
+    @staticmethod
+    def _stable_cut(text: str) -> int:
+        """最后一个不在代码块内的空行位置，之前的内容不会再变化"""
+        cut = text.rfind("\n\n")
+        while cut > 0 and text.count("```", 0, cut) % 2:
+            cut = text.rfind("\n\n", 0, cut)
+        return max(cut, 0)
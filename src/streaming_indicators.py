@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+流式技术指标模块
+保存滚动和、EMA状态、KDJ的K/D和OBV累计值，每根新K线O(1)更新，
+结果与 TechnicalAnalyzer.calculate_all_indicators 一致
+"""
+
+import math
+from collections import deque
+from typing import Any, Dict, Mapping
+
+import pandas as pd
+
+try:
+    from .technical_analysis import MA_PERIODS, EMA_PERIODS, VOL_MA_PERIODS, INDICATOR_COLUMNS
+except ImportError:
+    from technical_analysis import MA_PERIODS, EMA_PERIODS, VOL_MA_PERIODS, INDICATOR_COLUMNS
+
+
+NAN = float('nan')
+
+
+def _isnan(x: float) -> bool:
+    return x != x
+
+
+class RollingMean:
+    """滚动均值（窗口不满或含NaN时为NaN）"""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self.nan_count = 0
+        self.count = 0  # 用于定期重算，消除累计浮点误差
+
+    def update(self, x: float) -> float:
+        if len(self.values) == self.window:
+            old = self.values[0]
+            if _isnan(old):
+                self.nan_count -= 1
+            else:
+                self.total -= old
+        self.values.append(x)
+        if _isnan(x):
+            self.nan_count += 1
+        else:
+            self.total += x
+        self.count += 1
+        if self.count % self.window == 0:
+            self.total = math.fsum(v for v in self.values if not _isnan(v))
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if len(self.values) < self.window or self.nan_count:
+            return NAN
+        return self.total / self.window
+
+    def to_state(self) -> Dict[str, Any]:
+        return {'window': self.window, 'values': list(self.values)}
+
+    @classmethod
+    def from_state(cls, state: Mapping[str, Any]) -> 'RollingMean':
+        obj = cls(state['window'])
+        for v in state['values']:
+            obj.update(v)
+        return obj
+
+
+class RollingStd(RollingMean):
+    """滚动样本标准差(ddof=1)"""
+
+    def __init__(self, window: int):
+        super().__init__(window)
+        self.total_sq = 0.0
+
+    def update(self, x: float) -> float:
+        if len(self.values) == self.window and not _isnan(self.values[0]):
+            self.total_sq -= self.values[0] ** 2
+        if not _isnan(x):
+            self.total_sq += x * x
+        super().update(x)
+        if self.count % self.window == 0:
+            self.total_sq = math.fsum(v * v for v in self.values if not _isnan(v))
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if len(self.values) < self.window or self.nan_count:
+            return NAN
+        n = self.window
+        var = (self.total_sq - self.total * self.total / n) / (n - 1)
+        return math.sqrt(max(var, 0.0))
+
+
+class RollingExtreme:
+    """滚动最大/最小值（单调队列，均摊O(1)）"""
+
+    def __init__(self, window: int, mode: str = 'max'):
+        self.window = window
+        self.mode = mode
+        self.index = 0
+        self.candidates = deque()  # (index, value)
+        self.nan_indices = deque()
+
+    def update(self, x: float) -> float:
+        i = self.index
+        self.index += 1
+        start = i - self.window + 1
+        while self.candidates and self.candidates[0][0] < start:
+            self.candidates.popleft()
+        while self.nan_indices and self.nan_indices[0] < start:
+            self.nan_indices.popleft()
+        if _isnan(x):
+            self.nan_indices.append(i)
+        else:
+            better = (lambda v: v <= x) if self.mode == 'max' else (lambda v: v >= x)
+            while self.candidates and better(self.candidates[-1][1]):
+                self.candidates.pop()
+            self.candidates.append((i, x))
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if self.index < self.window or self.nan_indices or not self.candidates:
+            return NAN
+        return self.candidates[0][1]
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            'window': self.window,
+            'mode': self.mode,
+            'index': self.index,
+            'candidates': [list(c) for c in self.candidates],
+            'nan_indices': list(self.nan_indices)
+        }
+
+    @classmethod
+    def from_state(cls, state: Mapping[str, Any]) -> 'RollingExtreme':
+        obj = cls(state['window'], state['mode'])
+        obj.index = state['index']
+        obj.candidates = deque(tuple(c) for c in state['candidates'])
+        obj.nan_indices = deque(state['nan_indices'])
+        return obj
+
+
+class EMA:
+    """指数移动平均，等价于 pandas ewm(alpha=alpha, adjust=False).mean()"""
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.weighted = NAN
+        self.old_wt = 1.0
+
+    def update(self, x: float) -> float:
+        if not _isnan(self.weighted):
+            self.old_wt *= 1 - self.alpha
+            if not _isnan(x):
+                if self.weighted != x:
+                    self.weighted = (self.old_wt * self.weighted + self.alpha * x) / (self.old_wt + self.alpha)
+                self.old_wt = 1.0
+        elif not _isnan(x):
+            self.weighted = x
+        return self.weighted
+
+    @property
+    def value(self) -> float:
+        return self.weighted
+
+    def to_state(self) -> Dict[str, Any]:
+        return {'alpha': self.alpha, 'weighted': self.weighted, 'old_wt': self.old_wt}
+
+    @classmethod
+    def from_state(cls, state: Mapping[str, Any]) -> 'EMA':
+        obj = cls(state['alpha'])
+        obj.weighted = state['weighted']
+        obj.old_wt = state['old_wt']
+        return obj
+
+
+class IndicatorStream:
+    """
+    单个标的的流式指标状态
+
+    用法:
+        stream = IndicatorStream.from_history(df)
+        values = stream.update({'close': 10.2, 'high': 10.5, 'low': 10.0, 'volume': 12000})
+    """
+
+    def __init__(self):
+        self.ma = {p: RollingMean(p) for p in MA_PERIODS}
+        self.ema = {p: EMA(2 / (p + 1)) for p in EMA_PERIODS}
+        self.gain = RollingMean(14)
+        self.loss = RollingMean(14)
+        self.macd_signal = EMA(2 / 10)
+        self.boll_std = RollingStd(20)
+        self.low_n = RollingExtreme(9, 'min')
+        self.high_n = RollingExtreme(9, 'max')
+        self.k = EMA(1 / 3)
+        self.d = EMA(1 / 3)
+        self.vol_ma = {p: RollingMean(p) for p in VOL_MA_PERIODS}
+        self.atr = RollingMean(14)
+        self.obv = 0.0
+        self.prev_close = NAN
+        self.bars = 0
+
+    def update(self, bar: Mapping[str, float]) -> Dict[str, float]:
+        """输入一根新K线，返回全部指标的最新值"""
+        close = float(bar['close'])
+        high = float(bar['high'])
+        low = float(bar['low'])
+        volume = float(bar['volume'])
+        prev_close = self.prev_close
+        out = {}
+
+        for p, ma in self.ma.items():
+            out[f'MA{p}'] = ma.update(close)
+        for p, ema in self.ema.items():
+            out[f'EMA{p}'] = ema.update(close)
+
+        # RSI
+        delta = close - prev_close
+        gain = self.gain.update(delta if delta > 0 else 0.0)
+        loss = self.loss.update(-delta if delta < 0 else 0.0)
+        out['RSI'] = self._rsi(gain, loss)
+
+        # MACD
+        macd = out['EMA12'] - out['EMA26']
+        signal = self.macd_signal.update(macd)
+        out['MACD'] = macd
+        out['MACD_Signal'] = signal
+        out['MACD_Histogram'] = macd - signal
+
+        # 布林带
+        mid = out['MA20']
+        std = self.boll_std.update(close)
+        upper = mid + std * 2.0
+        lower = mid - std * 2.0
+        out['BOLL_MID'] = mid
+        out['BOLL_STD'] = std
+        out['BOLL_UPPER'] = upper
+        out['BOLL_LOWER'] = lower
+        out['BOLL_WIDTH'] = self._div(upper - lower, mid)
+
+        # KDJ
+        low_n = self.low_n.update(low)
+        high_n = self.high_n.update(high)
+        rsv = self._div(close - low_n, high_n - low_n) * 100
+        k = self.k.update(rsv)
+        d = self.d.update(k)
+        out['K'] = k
+        out['D'] = d
+        out['J'] = 3 * k - 2 * d
+
+        for p, ma in self.vol_ma.items():
+            out[f'VOL_MA{p}'] = ma.update(volume)
+
+        # ATR（忽略NaN取最大值）
+        ranges = [r for r in (high - low, abs(high - prev_close), abs(low - prev_close)) if not _isnan(r)]
+        out['ATR'] = self.atr.update(max(ranges) if ranges else NAN)
+
+        # OBV
+        if close > prev_close:
+            self.obv += volume
+        elif close < prev_close:
+            self.obv -= volume
+        out['OBV'] = self.obv
+
+        self.prev_close = close
+        self.bars += 1
+        return {name: out[name] for name in INDICATOR_COLUMNS}
+
+    @classmethod
+    def from_history(cls, data: pd.DataFrame) -> 'IndicatorStream':
+        """用历史K线预热状态"""
+        stream = cls()
+        for close, high, low, volume in zip(data['close'].tolist(), data['high'].tolist(),
+                                            data['low'].tolist(), data['volume'].tolist()):
+            stream.update({'close': close, 'high': high, 'low': low, 'volume': volume})
+        return stream
+
+    def to_state(self) -> Dict[str, Any]:
+        """导出状态（可JSON序列化）"""
+        return {
+            'ma': {str(p): ma.to_state() for p, ma in self.ma.items()},
+            'ema': {str(p): ema.to_state() for p, ema in self.ema.items()},
+            'gain': self.gain.to_state(),
+            'loss': self.loss.to_state(),
+            'macd_signal': self.macd_signal.to_state(),
+            'boll_std': self.boll_std.to_state(),
+            'low_n': self.low_n.to_state(),
+            'high_n': self.high_n.to_state(),
+            'k': self.k.to_state(),
+            'd': self.d.to_state(),
+            'vol_ma': {str(p): ma.to_state() for p, ma in self.vol_ma.items()},
+            'atr': self.atr.to_state(),
+            'obv': self.obv,
+            'prev_close': self.prev_close,
+            'bars': self.bars
+        }
+
+    @classmethod
+    def from_state(cls, state: Mapping[str, Any]) -> 'IndicatorStream':
+        """从导出的状态恢复"""
+        stream = cls()
+        stream.ma = {int(p): RollingMean.from_state(s) for p, s in state['ma'].items()}
+        stream.ema = {int(p): EMA.from_state(s) for p, s in state['ema'].items()}
+        stream.gain = RollingMean.from_state(state['gain'])
+        stream.loss = RollingMean.from_state(state['loss'])
+        stream.macd_signal = EMA.from_state(state['macd_signal'])
+        stream.boll_std = RollingStd.from_state(state['boll_std'])
+        stream.low_n = RollingExtreme.from_state(state['low_n'])
+        stream.high_n = RollingExtreme.from_state(state['high_n'])
+        stream.k = EMA.from_state(state['k'])
+        stream.d = EMA.from_state(state['d'])
+        stream.vol_ma = {int(p): RollingMean.from_state(s) for p, s in state['vol_ma'].items()}
+        stream.atr = RollingMean.from_state(state['atr'])
+        stream.obv = state['obv']
+        stream.prev_close = state['prev_close']
+        stream.bars = state['bars']
+        return stream
+
+    @staticmethod
+    def _div(a: float, b: float) -> float:
+        if b == 0:
+            if a == 0 or _isnan(a):
+                return NAN
+            return math.copysign(math.inf, a)
+        return a / b
+
+    @classmethod
+    def _rsi(cls, gain: float, loss: float) -> float:
+        rs = cls._div(gain, loss)
+        return 100 - 100 / (1 + rs)
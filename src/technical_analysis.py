@@ -9,6 +9,68 @@ import numpy as np
 from typing import Dict, List, Optional, Tuple
 
 
+# 融合计算输出的指标列（与逐个调用calculate_*的结果列一致）
+MA_PERIODS = [5, 10, 20, 60]
+EMA_PERIODS = [5, 12, 26]
+VOL_MA_PERIODS = [5, 10, 20]
+INDICATOR_COLUMNS = (
+    [f'MA{p}' for p in MA_PERIODS]
+    + [f'EMA{p}' for p in EMA_PERIODS]
+    + ['RSI', 'MACD', 'MACD_Signal', 'MACD_Histogram',
+       'BOLL_MID', 'BOLL_STD', 'BOLL_UPPER', 'BOLL_LOWER', 'BOLL_WIDTH',
+       'K', 'D', 'J']
+    + [f'VOL_MA{p}' for p in VOL_MA_PERIODS]
+    + ['ATR', 'OBV']
+)
+
+
+def _rolling(x: np.ndarray, window: int, func, out: np.ndarray, **kwargs) -> np.ndarray:
+    """沿时间轴(axis 0)滚动窗口计算，窗口不满或含NaN时为NaN（同pandas rolling默认行为）"""
+    out[:window - 1] = np.nan
+    if len(x) >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(x, window, axis=0)
+        func(windows, axis=-1, out=out[window - 1:], **kwargs)
+    return out
+
+
+def _ema(x: np.ndarray, alpha: float, out: np.ndarray) -> np.ndarray:
+    """指数移动平均，等价于 pandas ewm(alpha=alpha, adjust=False).mean()"""
+    if x.ndim > 1:
+        return _ema_panel(x, alpha, out)
+    decay = 1 - alpha
+    weighted = np.nan
+    old_wt = 1.0
+    for i, cur in enumerate(x.tolist()):
+        if weighted == weighted:
+            old_wt *= decay
+            if cur == cur:
+                if weighted != cur:
+                    weighted = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+                old_wt = 1.0
+        elif cur == cur:
+            weighted = cur
+        out[i] = weighted
+    return out
+
+
+def _ema_panel(x: np.ndarray, alpha: float, out: np.ndarray) -> np.ndarray:
+    """多标的指数移动平均，沿时间轴递推，各列同时计算"""
+    decay = 1 - alpha
+    weighted = np.full(x.shape[1:], np.nan)
+    old_wt = np.ones(x.shape[1:])
+    for i in range(len(x)):
+        cur = x[i]
+        has_weighted = ~np.isnan(weighted)
+        observed = ~np.isnan(cur)
+        old_wt = np.where(has_weighted, old_wt * decay, old_wt)
+        step = has_weighted & observed & (weighted != cur)
+        weighted = np.where(step, (old_wt * weighted + alpha * cur) / (old_wt + alpha), weighted)
+        old_wt = np.where(has_weighted & observed, 1.0, old_wt)
+        weighted = np.where(~has_weighted & observed, cur, weighted)
+        out[i] = weighted
+    return out
+
+
 class TechnicalAnalyzer:
     """技术分析器"""
     
@@ -103,29 +165,132 @@ class TechnicalAnalyzer:
                                      -df['volume'], 0)).cumsum()
         return df
     
+    @staticmethod
+    def compute_indicators(close: np.ndarray, high: np.ndarray, low: np.ndarray,
+                           volume: np.ndarray) -> np.ndarray:
+        """
+        融合计算全部指标
+
+        一次性读取价格和成交量数组，所有指标写入预分配的数组。
+        输入为一维(日期)或二维(日期×标的)数组，时间在第0轴；
+        输出形状为 (指标数,) + 输入形状，指标顺序见 INDICATOR_COLUMNS
+        """
+        close = np.asarray(close, dtype=float)
+        high = np.asarray(high, dtype=float)
+        low = np.asarray(low, dtype=float)
+        volume = np.asarray(volume, dtype=float)
+        n = len(close)
+        shape = close.shape
+        out = np.empty((len(INDICATOR_COLUMNS),) + shape)
+        col = dict(zip(INDICATOR_COLUMNS, out))
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # 均线 / 指数均线
+            for period in MA_PERIODS:
+                _rolling(close, period, np.mean, col[f'MA{period}'])
+            for period in EMA_PERIODS:
+                _ema(close, 2 / (period + 1), col[f'EMA{period}'])
+            
+            # RSI
+            prev_close = np.empty(shape)
+            prev_close[:1] = np.nan
+            prev_close[1:] = close[:-1]
+            delta = close - prev_close
+            gain = _rolling(np.where(delta > 0, delta, 0), 14, np.mean, np.empty(shape))
+            loss = _rolling(np.where(delta < 0, -delta, 0), 14, np.mean, np.empty(shape))
+            np.subtract(100, 100 / (1 + gain / loss), out=col['RSI'])
+            
+            # MACD
+            np.subtract(col['EMA12'], col['EMA26'], out=col['MACD'])
+            _ema(col['MACD'], 2 / 10, col['MACD_Signal'])
+            np.subtract(col['MACD'], col['MACD_Signal'], out=col['MACD_Histogram'])
+            
+            # 布林带
+            mid, std = col['BOLL_MID'], col['BOLL_STD']
+            mid[:] = col['MA20']
+            _rolling(close, 20, np.std, std, ddof=1)
+            np.add(mid, std * 2.0, out=col['BOLL_UPPER'])
+            np.subtract(mid, std * 2.0, out=col['BOLL_LOWER'])
+            np.divide(col['BOLL_UPPER'] - col['BOLL_LOWER'], mid, out=col['BOLL_WIDTH'])
+            
+            # KDJ
+            low_n = _rolling(low, 9, np.min, np.empty(shape))
+            high_n = _rolling(high, 9, np.max, np.empty(shape))
+            rsv = (close - low_n) / (high_n - low_n) * 100
+            _ema(rsv, 1 / 3, col['K'])
+            _ema(col['K'], 1 / 3, col['D'])
+            np.subtract(3 * col['K'], 2 * col['D'], out=col['J'])
+            
+            # 成交量均线
+            for period in VOL_MA_PERIODS:
+                _rolling(volume, period, np.mean, col[f'VOL_MA{period}'])
+            
+            # ATR（真实波幅取三者最大值，忽略NaN）
+            true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+            _rolling(true_range, 14, np.mean, col['ATR'])
+            
+            # OBV
+            signed_volume = np.where(close > prev_close, volume, np.where(close < prev_close, -volume, 0))
+            np.cumsum(signed_volume, axis=0, out=col['OBV'])
+        
+        return out
+    
     @staticmethod
     def calculate_all_indicators(data: pd.DataFrame) -> pd.DataFrame:
         """计算所有技术指标"""
-        df = data.copy()
-        
         # 确保有必要的列
         required_cols = ['open', 'high', 'low', 'close', 'volume']
         for col in required_cols:
-            if col not in df.columns:
+            if col not in data.columns:
                 raise ValueError(f"缺少必要列: {col}")
         
-        # 计算各类指标
-        df = TechnicalAnalyzer.calculate_ma(df)
-        df = TechnicalAnalyzer.calculate_ema(df)
-        df = TechnicalAnalyzer.calculate_rsi(df)
-        df = TechnicalAnalyzer.calculate_macd(df)
-        df = TechnicalAnalyzer.calculate_bollinger(df)
-        df = TechnicalAnalyzer.calculate_kdj(df)
-        df = TechnicalAnalyzer.calculate_volume_ma(df)
-        df = TechnicalAnalyzer.calculate_atr(df)
-        df = TechnicalAnalyzer.calculate_obv(df)
+        values = TechnicalAnalyzer.compute_indicators(
+            data['close'].to_numpy(), data['high'].to_numpy(),
+            data['low'].to_numpy(), data['volume'].to_numpy()
+        )
+        indicators = pd.DataFrame(values.T, index=data.index, columns=INDICATOR_COLUMNS, copy=False)
+        base = data.drop(columns=[c for c in INDICATOR_COLUMNS if c in data.columns])
+        return pd.concat([base, indicators], axis=1)
+    
+    @staticmethod
+    def to_panel(frames: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """
+        将多个标的的K线合并为面板数据
+
+        Args:
+            frames: 标的 -> K线DataFrame（列名不区分大小写，如yfinance的Close）
+
+        Returns:
+            字段(close/high/low/volume) -> 日期×标的 DataFrame，按日期外连接对齐
+        """
+        panel = {}
+        for field in ['close', 'high', 'low', 'volume']:
+            columns = {}
+            for symbol, df in frames.items():
+                lookup = {c.lower(): c for c in df.columns if isinstance(c, str)}
+                if field in lookup:
+                    columns[symbol] = df[lookup[field]]
+            panel[field] = pd.DataFrame(columns).sort_index()
+        return panel
+    
+    @staticmethod
+    def calculate_panel_indicators(close: pd.DataFrame, high: pd.DataFrame,
+                                   low: pd.DataFrame, volume: pd.DataFrame) -> pd.DataFrame:
+        """
+        面板(多标的)向量化计算全部指标
+
+        输入为日期×标的的DataFrame，逐列计算结果与 calculate_all_indicators 相同。
+        返回列为 (指标, 标的) 两级索引的DataFrame，如 result['RSI'] 为日期×标的的RSI
+        """
+        index, symbols = close.index, close.columns
+        fields = [f.reindex(index=index, columns=symbols).to_numpy() for f in (close, high, low, volume)]
+        values = TechnicalAnalyzer.compute_indicators(*fields)
         
-        return df
+        # (指标, 日期, 标的) -> 日期 × (指标, 标的)
+        n_ind, n_dates, n_symbols = values.shape
+        flat = values.transpose(1, 0, 2).reshape(n_dates, n_ind * n_symbols)
+        columns = pd.MultiIndex.from_product([INDICATOR_COLUMNS, symbols], names=['indicator', 'symbol'])
+        return pd.DataFrame(flat, index=index, columns=columns)
     
     @staticmethod
     def get_latest_signals(data: pd.DataFrame) -> Dict:
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+A股交易日历
+新浪交易日历保存在本地，最多每月刷新一次（查询日期超出覆盖范围时提前刷新）；加载为有序的日期序号数组，
+交易日判断、前后交易日和区间交易日计数均为二分查找
+"""
+
+import os
+import json
+import time
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Union
+
+try:
+    from .fixtures import market_provider
+except ImportError:
+    from fixtures import market_provider
+
+
+DateLike = Union[date, datetime, str]
+
+
+def _ordinal(value: DateLike) -> int:
+    if isinstance(value, str):
+        value = datetime.strptime(value.replace('-', '')[:8], '%Y%m%d')
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.toordinal()
+
+
+class TradingCalendar:
+    """
+    本地交易日历
+
+    查询日期超出日历覆盖范围时重新下载（两次下载至少间隔 retry_seconds 秒）；
+    仍未覆盖的日期（如下一年的日期、无法下载日历时）按周一到周五为交易日处理。
+    """
+
+    def __init__(self, path: str = "data/calendar/trade_dates.json", max_age_days: int = 30,
+                 retry_seconds: float = 3600):
+        self.path = path
+        self.max_age_days = max_age_days
+        self.retry_seconds = retry_seconds
+        self._ordinals: Optional[List[int]] = None
+        self._fetched_at: Optional[datetime] = None
+        self._attempted_at: Optional[float] = None     # time.monotonic()，最近一次下载
+        self._lock = threading.Lock()
+
+    # ==================== 加载 ====================
+
+    def _load(self) -> List[int]:
+        """首次使用时加载，本地文件过期则重新下载"""
+        if self._ordinals is not None:
+            return self._ordinals
+        with self._lock:
+            if self._ordinals is None:
+                ordinals = self._read()
+                if ordinals is None or self._stale():
+                    ordinals = self.refresh() or ordinals or []
+                self._ordinals = ordinals
+        return self._ordinals
+
+    def _read(self) -> Optional[List[int]]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+            self._fetched_at = datetime.strptime(payload['fetched_at'], '%Y-%m-%d %H:%M:%S')
+            return sorted(_ordinal(d) for d in payload['dates'])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _stale(self) -> bool:
+        return self._fetched_at is None or datetime.now() - self._fetched_at > timedelta(days=self.max_age_days)
+
+    def refresh(self) -> Optional[List[int]]:
+        """重新下载交易日历并保存，失败时返回None"""
+        self._attempted_at = time.monotonic()
+        try:
+            ak = market_provider('akshare')
+            df = ak.tool_trade_date_hist_sina()
+            ordinals = sorted({_ordinal(str(d)) for d in df['trade_date']})
+        except Exception as e:
+            print(f"下载交易日历失败: {e}")
+            return None
+        if not ordinals:
+            return None
+
+        self._fetched_at = datetime.now()
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'fetched_at': self._fetched_at.strftime('%Y-%m-%d %H:%M:%S'),
+                'dates': [date.fromordinal(o).isoformat() for o in ordinals]
+            }, f)
+        os.replace(tmp_path, self.path)
+        self._ordinals = ordinals
+        return ordinals
+
+    def _covers(self, ordinal: int) -> bool:
+        """日历是否覆盖该日期；未覆盖时按间隔限制重新下载一次（如跨年后的新日历）"""
+        ordinals = self._load()
+        if ordinals and ordinals[0] <= ordinal <= ordinals[-1]:
+            return True
+        with self._lock:
+            attempted_at = self._attempted_at
+            if attempted_at is None or time.monotonic() - attempted_at >= self.retry_seconds:
+                self.refresh()
+        ordinals = self._ordinals
+        return bool(ordinals) and ordinals[0] <= ordinal <= ordinals[-1]
+
+    # ==================== 查询 ====================
+
+    def is_trading_day(self, value: DateLike = None) -> bool:
+        """是否为交易日，默认今天"""
+        ordinal = _ordinal(value or datetime.now())
+        if not self._covers(ordinal):
+            return date.fromordinal(ordinal).weekday() < 5
+        ordinals = self._ordinals
+        i = bisect_left(ordinals, ordinal)
+        return i < len(ordinals) and ordinals[i] == ordinal
+
+    def next_trading_day(self, value: DateLike = None) -> date:
+        """严格晚于给定日期的第一个交易日"""
+        ordinal = _ordinal(value or datetime.now())
+        covered = self._covers(ordinal)
+        ordinals = self._ordinals
+        i = bisect_right(ordinals, ordinal)
+        if covered and i < len(ordinals):
+            return date.fromordinal(ordinals[i])
+        ordinal += 1
+        while date.fromordinal(ordinal).weekday() >= 5:
+            ordinal += 1
+        return date.fromordinal(ordinal)
+
+    def previous_trading_day(self, value: DateLike = None) -> date:
+        """严格早于给定日期的最后一个交易日"""
+        ordinal = _ordinal(value or datetime.now())
+        covered = self._covers(ordinal - 1)
+        ordinals = self._ordinals
+        i = bisect_left(ordinals, ordinal)
+        if covered and i > 0:
+            return date.fromordinal(ordinals[i - 1])
+        ordinal -= 1
+        while date.fromordinal(ordinal).weekday() >= 5:
+            ordinal -= 1
+        return date.fromordinal(ordinal)
+
+    def trading_days_between(self, start: DateLike, end: DateLike) -> int:
+        """start 到 end（均包含）之间的交易日数量"""
+        lo, hi = _ordinal(start), _ordinal(end)
+        if lo > hi:
+            return 0
+        if self._covers(lo) and self._covers(hi):
+            ordinals = self._ordinals
+            return bisect_right(ordinals, hi) - bisect_left(ordinals, lo)
+        return sum(1 for o in range(lo, hi + 1) if self.is_trading_day(date.fromordinal(o)))
+
+    def shift(self, value: DateLike, n: int) -> date:
+        """向后(n>0)或向前(n<0)第n个交易日；n=0 时返回不晚于该日期的最近交易日"""
+        current = date.fromordinal(_ordinal(value))
+        if n == 0:
+            return current if self.is_trading_day(current) else self.previous_trading_day(current)
+        step = self.next_trading_day if n > 0 else self.previous_trading_day
+        ordinal = _ordinal(current)
+        covered = self._covers(ordinal)
+        ordinals = self._ordinals
+        if n > 0 and covered:
+            i = bisect_right(ordinals, ordinal) + n - 1
+            if i < len(ordinals):
+                return date.fromordinal(ordinals[i])
+        elif n < 0 and covered:
+            i = bisect_left(ordinals, ordinal) + n
+            if i >= 0:
+                return date.fromordinal(ordinals[i])
+        for _ in range(abs(n)):
+            current = step(current)
+        return current
+
+
+# 单例模式（首次查询时才加载日历）
+trading_calendar = TradingCalendar()
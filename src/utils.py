@@ -90,9 +90,23 @@ def load_json(filepath: str) -> Optional[Dict]:
         return json.load(f)
 
 
-def get_date_range(days: int = 30) -> tuple:
-    """获取日期范围"""
+def get_date_range(days: int = 30, trading_days: bool = False) -> tuple:
+    """
+    获取日期范围
+    
+    Args:
+        days: 天数
+        trading_days: 为True时按交易日计算，返回最近days个交易日的首尾日期
+    """
     end = datetime.now()
+    if trading_days:
+        try:
+            from .trading_calendar import trading_calendar
+        except ImportError:
+            from trading_calendar import trading_calendar
+        last = trading_calendar.shift(end, 0)
+        start = trading_calendar.shift(last, -(days - 1)) if days > 1 else last
+        return start.strftime('%Y%m%d'), last.strftime('%Y%m%d')
     start = end - timedelta(days=days)
     return start.strftime('%Y%m%d'), end.strftime('%Y%m%d')
 